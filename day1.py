@@ -1,18 +1,36 @@
 """Paul's solution for AOC day 1`."""
 
-from lib import data_lines, windowize
+import numpy as np                               # pylint: disable=import-error
 
+from lib import data_ints, windowize
 
-def calc_incs(values):
+
+def calc_incs(values: np.ndarray) -> int:
     """Calculate number of increments for part A."""
-    print(sum(1 for a, b in windowize(values, 2) if b > a))
+    pairs = windowize(values, 2)
+    return int(np.count_nonzero(pairs[:, 1] > pairs[:, 0]))
 
 
-def calc_windowed_incs(values):
+def calc_windowed_incs(values: np.ndarray) -> int:
     """Calculate number of increments for part B."""
-    calc_incs(list(sum(t) for t in windowize(values, 3)))
+    return calc_incs(windowize(values, 3).sum(axis=1))
+
+
+def parse_depth_data() -> np.ndarray:
+    """Parse the sonar sweep depth measurements."""
+    return data_ints(__file__)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return calc_incs(parse_depth_data())
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return calc_windowed_incs(parse_depth_data())
 
 
-input_data = [int(line) for line in data_lines(__file__)]
-calc_incs(input_data)
-calc_windowed_incs(input_data)
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -3,6 +3,7 @@
 from typing import List, Tuple
 
 from lib import data_lines
+from parallel import parallel_map
 
 
 def load_navigation_subsystem() -> List[str]:
@@ -51,11 +52,11 @@ def find_syntax_errors():
         '>': 25137,
     }
     score = 0
-    for line in load_navigation_subsystem():
-        c, _ = parse_navigation_line(line)
+    lines = load_navigation_subsystem()
+    for c, _ in parallel_map(parse_navigation_line, lines):
         if c:
             score += score_lookup[c]
-    print(score)
+    return score
 
 
 def complete_lines():
@@ -68,8 +69,8 @@ def complete_lines():
         '>': 4,
     }
     scores = []
-    for line in load_navigation_subsystem():
-        _, completion = parse_navigation_line(line)
+    lines = load_navigation_subsystem()
+    for _, completion in parallel_map(parse_navigation_line, lines):
         if completion:
             score = 0
             for c in completion:
@@ -77,8 +78,19 @@ def complete_lines():
                 score += score_lookup[c]
             scores.append(score)
     m = len(scores) // 2
-    print(sorted(scores)[m])
+    return sorted(scores)[m]
 
 
-find_syntax_errors()
-complete_lines()
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_syntax_errors()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return complete_lines()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -68,7 +68,7 @@ def find_all_routes():
     total = 0
     for _ in iter_routes(network, 'start', [], set()):
         total += 1
-    print(total)
+    return total
 
 
 def find_all_relaxed_routes():
@@ -77,8 +77,19 @@ def find_all_relaxed_routes():
     total = 0
     for _ in iter_routes(network, 'start', [], set(), can_revisit=True):
         total += 1
-    print(total)
+    return total
 
 
-find_all_routes()
-find_all_relaxed_routes()
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_all_routes()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_all_relaxed_routes()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -3,7 +3,7 @@
 from itertools import zip_longest
 from typing import List, Tuple
 
-from lib import data_lines
+from lib import BitVector, data_lines
 
 my_code = '''
 ###   ##  #  # #### ###  ####   ##  ##
@@ -16,7 +16,7 @@ my_code = '''
 my_code_str = 'PGHZBFJC'
 
 
-def parse_code_page() -> Tuple[List[List[int]], List[Tuple[str, int]]]:
+def parse_code_page() -> Tuple[List[BitVector], List[Tuple[str, int]]]:
     """Parse the code page (page 1) of the thermal camera.
 
     The input starts with a sequence of coordinates of the form (col_idx,
@@ -26,8 +26,8 @@ def parse_code_page() -> Tuple[List[List[int]], List[Tuple[str, int]]]:
         fold along y=8
 
     This parser produces an image of the paper organised as a list of rows,
-    where each row is a list of integers. A zero indicate no dot and the value
-    1 represents a dot.
+    where each row is a bit vector. A zero indicate no dot and a one
+    represents a dot.
     """
     coords: List[Tuple[int, int]] = []
     lines = data_lines(__file__)
@@ -46,37 +46,34 @@ def parse_code_page() -> Tuple[List[List[int]], List[Tuple[str, int]]]:
 
     num_cols = max(c for c, _ in coords) + 1
     num_rows = max(r for _, r in coords) + 1
-    paper: List[List[int]] = [[0] * num_cols for _ in range(num_rows)]
+    row_values = [0] * num_rows
     for c, r in coords:
-        paper[r][c] = 1
-    return paper, folds
+        row_values[r] |= 1 << (num_cols - 1 - c)
+    return [BitVector(v, num_cols) for v in row_values], folds
 
 
-def fold_along_y(paper: List[List[int]], y: int) -> List[List[int]]:
+def fold_along_y(paper: List[BitVector], y: int) -> List[BitVector]:
     """Fold the paper along a y coordinate."""
     top, bottom = paper[:y], paper[y+1:]
-    result: List[List[int]] = []
-    lzip = zip_longest
-    for topline, bottomline in lzip(reversed(top), bottom, fillvalue=[]):
-        result.append(
-            [a | b for a, b in lzip(topline, bottomline, fillvalue=0)])
+    blank = BitVector()
+    result = [
+        a | b for a, b in zip_longest(
+            reversed(top), bottom, fillvalue=blank)]
     return list(reversed(result))
 
 
-def fold_along_x(paper: List[List[int]], x: int) -> List[List[int]]:
-    """Fold the paper along an x coordinate."""
-    lzip = zip_longest
-    result: List[List[int]] = []
+def fold_along_x(paper: List[BitVector], x: int) -> List[BitVector]:
+    """Fold the paper along an x coordinate.
 
-    for row in paper:
-        left, right = row[:x], row[x+1:]
-        result.append(list(reversed(
-            [a | b for a, b in lzip(reversed(left), right, fillvalue=0)])))
-    return result
+    The left hand part of each row stays in place and the right hand part is
+    reversed on to it. Both end at the fold, so are aligned as the bitwise
+    operators require.
+    """
+    return [row[:x] | row[x+1:].reversed() for row in paper]
 
 
 def perform_fold(
-        paper: List[List[int]], fold: tuple[str, int]) -> List[List[int]]:
+        paper: List[BitVector], fold: tuple[str, int]) -> List[BitVector]:
     """Performa given fold.
 
     :paper: The paper to fold.
@@ -97,7 +94,7 @@ def fold_once():
         paper = perform_fold(paper, fold)
         break
 
-    print(sum(row.count(1) for row in paper))
+    return sum(row.popcount() for row in paper)
 
 
 def fold_completely():
@@ -106,18 +103,26 @@ def fold_completely():
     for fold in folds:
         paper = perform_fold(paper, fold)
 
-    lkup = {0: ' ', 1: '#'}
+    lkup = str.maketrans('01', ' #')
     big_code = '\n' + '\n'.join(
-        ''.join(lkup[v] for v in row).rstrip() for row in paper)
+        str(row).translate(lkup).rstrip() for row in paper)
     big_code += '\n'
     if big_code == my_code:
-        print(my_code_str)
+        return my_code_str
     else:
-        print(repr(big_code))
-        print(big_code)
-        print(repr(my_code))
-        print(my_code)
+        return big_code
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return fold_once()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return fold_completely()
 
 
-fold_once()
-fold_completely()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -97,8 +97,19 @@ def grow_polymer(n_steps: int):
 
     el_counts[polymer[-1]] += 1
     ordered_counts = el_counts.most_common()
-    print(ordered_counts[0][1] - ordered_counts[-1][1])
+    return ordered_counts[0][1] - ordered_counts[-1][1]
 
 
-grow_polymer(10)
-grow_polymer(40)
+def part1():
+    """Solve part 1 of the puzzle."""
+    return grow_polymer(10)
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return grow_polymer(40)
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
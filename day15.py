@@ -1,152 +1,96 @@
 """Paul's solution for AOC day 15."""
 
-from typing import List
+import numpy as np                               # pylint: disable=import-error
 
-from lib import data_lines
+from lib import Grid
 
+# A total risk value that is bigger than any real route's total.
+MAX_RISK = 1 << 48
 
-def parse_risk_grid(expand=False) -> List[List[int]]:
+
+def parse_risk_grid(expand=False) -> np.ndarray:
     """Parse the risk grid.
 
     The grid input is simply a sequence of lines containing digits 1 to 9.
-    Each digit is a risk level. We can simply load it as a nested list of
-    integers.
-    """
-    grid = [[int(c) for c in line] for line in data_lines(__file__)]
-    if expand:
-        new_grid = []
-        for row in grid:
-            new_row = []
-            for n in range(5):
-                part = [(v + n - 1) % 9 + 1 for v in row]
-                new_row.extend(part)
-            new_grid.append(new_row)
-
-        grid, new_grid = new_grid, []
-        for n in range(5):
-            for row in grid:
-                new_grid.append([(v + n - 1) % 9 + 1 for v in row])
-
-        grid = new_grid
-
-    assert len(grid) == len(grid[0])  # Must be square.
-    return grid
-
-
-def add_initial_best_risk(grid, corner):
-    """Add initial figures for the best minimum risk for a grib border.
+    Each digit is a risk level.
 
-    The figures we not be the actual minima, but provide a good starting point
-    for refinement.
+    When expanded, the grid is tiled 5 times in each direction. Each step
+    right or down adds one to the tile's risk levels, with values above 9
+    wrapping around to 1.
     """
-    dmax = len(grid) - 1
+    grid = Grid.from_data(__file__).inner
+    if expand:
+        grid = np.block([
+            [(grid + (row + col) - 1) % 9 + 1 for col in range(5)]
+            for row in range(5)])
 
-    def calc_risk(x, y, offsets):
-        risk, _ = grid[y][x]
-        choices = []
-        for dx, dy in offsets:
-            xc, yc = x + dx, y + dy
-            if xc <= dmax and yc <= dmax:
-                choices.append(grid[yc][xc][1])
-        grid[y][x] = risk, min(risk + total for total in choices)
+    assert grid.shape[0] == grid.shape[1]  # Must be square.
+    return grid
 
-    for x, y in border_coords(corner, dmax):
-        calc_risk(x, y, [(0, 1), (1, 0)])
 
+def sweep_rows(totals: np.ndarray, risk: np.ndarray, inclusive: np.ndarray):
+    """Improve the route totals by following straight runs along each row.
 
-def top_border_coords(corner, dmax):
-    """Yield coordinate for the top border for a given corner."""
-    for x in range(dmax, corner, -1):
-        yield x, corner
+    Each cell's total is the lowest known risk of a route from that cell to
+    the destination, including the cell's own risk. A route from cell c that
+    runs along the row to cell k and then follows k's best route has a total
+    of totals[k] plus the risks of the cells from c up to, but not including,
+    k. This finds the best such route for every cell, in both directions,
+    using cumulative sums and minima instead of per-cell Python code.
 
+    :totals:    The route totals, which are updated in place.
+    :risk:      The risk of each cell.
+    :inclusive: The cumulative sum of the risks along each row.
+    """
+    exclusive = inclusive - risk
 
-def left_border_coords(corner, dmax):
-    """Yield coordinate for the left border for a given corner."""
-    for y in range(dmax, corner, -1):
-        yield corner, y
+    # Runs that head right: min over k >= c of totals[k] + exclusive[k],
+    # less exclusive[c].
+    heading_right = np.minimum.accumulate(
+        (totals + exclusive)[:, ::-1], axis=1)[:, ::-1] - exclusive
+    np.minimum(totals, heading_right, out=totals)
 
+    # Runs that head left: min over k <= c of totals[k] - inclusive[k], plus
+    # inclusive[c].
+    heading_left = np.minimum.accumulate(
+        totals - inclusive, axis=1) + inclusive
+    np.minimum(totals, heading_left, out=totals)
 
-def border_coords(corner, dmax):
-    """Yield coordinate for the border defined by a given corner."""
-    yield from top_border_coords(corner, dmax)
-    yield from left_border_coords(corner, dmax)
-    yield corner, corner
 
+def find_smallest_risk(expand=False):
+    """Find the value for the route with the lowest risk.
 
-def refine_risk(grid, corner):
-    """Visit each potentially unstable coord, refining its min risk."""
+    Starting with just the destination cell's total known, row and column
+    sweeps are repeated until the totals stop changing. Each sweep follows
+    complete straight runs, so the number of passes depends on how often the
+    best routes turn, not on their length.
+    """
+    risk = parse_risk_grid(expand).astype(np.int64)
+    totals = np.full(risk.shape, MAX_RISK, dtype=np.int64)
+    totals[-1, -1] = risk[-1, -1]
+    row_sums = np.cumsum(risk, axis=1)
+    col_sums = np.cumsum(risk, axis=0)
 
-    dmax = len(grid) - 1
-    changed = 0
+    while True:
+        prev_totals = totals.copy()
+        sweep_rows(totals, risk, row_sums)
+        sweep_rows(totals.T, risk.T, col_sums.T)
+        if np.array_equal(prev_totals, totals):
+            break
 
-    def expanding_border_coords(corner):
-        for i, c in enumerate(range(corner, -1, -1)):
-            yield from border_coords(c, dmax)
-            # TODO: This escape uses an un-verified heuristic. One day it would
-            #       be good to verify it, but it seems to work and I could add
-            #       a full grid pass to prove the grid is stable.
-            if i > 3 and changed:
-                break
+    return int(totals[0, 0] - risk[0, 0])
 
-    def calc_risk(x, y, offsets):
-        nonlocal changed, corner
 
-        risk, min_risk = grid[y][x]
-        choices = []
-        for dx, dy in offsets:
-            xc, yc = x + dx, y + dy
-            if 0 <= xc <= dmax and 0 <= yc <= dmax:
-                choices.append(grid[yc][xc][1])
-        alt_risk = min(risk + total for total in choices)
-        if alt_risk < min_risk:
-            grid[y][x] = risk, alt_risk
-            changed += 1
-            if changed == 1:
-                corner = min(x, y)
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_smallest_risk()
 
-    neighbours = ((0, 1), (1, 0), (0, -1), (-1, 0))
-    for x, y in expanding_border_coords(corner):
-        calc_risk(x, y, neighbours)
 
-    return changed, corner
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_smallest_risk(expand=True)
 
 
-def find_smallest_risk(expand=False):
-    """Find the value for the route with the lowest risk."""
-    input_grid = parse_risk_grid(expand)
-    grid = [[[risk, None] for risk in row] for row in input_grid]
-
-    # Mark the destination cell with its minimum risk and make it our
-    # initial wall.
-    dmax = len(grid) - 1
-    x = y = dmax
-    risk, _ = grid[y][x]
-    grid[y][x] = risk, risk
-    corner = dmax
-
-    for corner in range(dmax - 1, -1, -1):
-        add_initial_best_risk(grid, corner)
-
-    if debug:
-        for row in grid:
-            print([f'{str(v):9}' for v in row])
-
-    n = 0
-    cc = 1
-    corner = dmax - 1
-    while cc:
-        cc, corner = refine_risk(grid, corner)
-        n += 1
-
-    if debug:
-        print()
-        for row in grid:
-            print([f'{str(v):9}' for v in row])
-
-    risk, min_risk = grid[0][0]
-    print(min_risk - risk)
-
-
-debug = False
-find_smallest_risk()
-find_smallest_risk(expand=True)
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -1,10 +1,9 @@
 """Paul's solution for AOC day 16."""
 
 from dataclasses import dataclass
-from itertools import chain
-from typing import Iterator, List, Optional
+from typing import List, Optional, Tuple
 
-from lib import data_lines
+from lib import BitVector, data_lines
 
 
 @dataclass
@@ -48,72 +47,70 @@ class Packet:
                 raise RuntimeError(f'Bad type: {self.typ}')
 
 
-def parse_input() -> Iterator[int]:
+def parse_input() -> BitVector:
     """Parse the instruction input.
 
-    The input is a stream of hexadecimal digits, which we want to convert to a
-    stream of binary digits.
+    The input is a stream of hexadecimal digits, which is converted to a bit
+    vector of 4 bits per digit.
     """
-    line = next(data_lines(__file__))
-    hex_digits = (int(c, 16) for c in line)
-    binary_strings = (f'{d:04b}' for d in hex_digits)
-    return ((int(d) for d in chain(*binary_strings)))
+    return BitVector.from_hex(next(data_lines(__file__)).strip())
 
 
-def nbit_value(code: Iterator[int], count: int):
-    """Read in a number of bits as a value."""
-    v = 0
-    for _ in range(count):
-        v = (v << 1) | next(code)
-    return v
+def parse_packet(code: BitVector, pos: int = 0) -> Tuple[Packet, int]:
+    """Parse a packet.
 
-
-def nbits(code: Iterator[int], count: int):
-    """Iterate over a number of bits."""
-    for _ in range(count):
-        try:
-            yield next(code)
-        except StopIteration:
-            pass
-
-
-def parse_packet(code: Iterator[int]):
-    """Parse a packet."""
-    ver = nbit_value(code, 3)
-    typ = nbit_value(code, 3)
+    :code: The transmission.
+    :pos:  The position of the packet's first bit.
+    :return:
+        The packet and the position of the first bit after it.
+    """
+    ver = code.read(pos, 3)
+    typ = code.read(pos + 3, 3)
+    pos += 6
 
     if typ == 4:
-        bit_pattern = []
+        value = 0
         c = 1
         while c:
-            c = next(code)
-            bit_pattern.extend([str(b) for b in nbits(code, 4)])
-        return Packet(ver, typ, [], int(''.join(bit_pattern), 2))
-
+            c = code.read(pos, 1)
+            value = (value << 4) | code.read(pos + 1, 4)
+            pos += 5
+        return Packet(ver, typ, [], value), pos
+
+    sub_packets = []
+    fmt = code.read(pos, 1)
+    if fmt == 0:
+        end = pos + 16 + code.read(pos + 1, 15)
+        pos += 16
+        while pos < end:
+            sub_packet, pos = parse_packet(code, pos)
+            sub_packets.append(sub_packet)
     else:
-        fmt = next(code)
-        sub_packets = []
-        if fmt == 0:
-            sub_packet_code = nbits(code, nbit_value(code, 15))
-            while True:
-                try:
-                    sub_packets.append(parse_packet(sub_packet_code))
-                except StopIteration:
-                    break
-        else:
-            sub_packet_count = nbit_value(code, 11)
-            for _ in range(sub_packet_count):
-                sub_packets.append(parse_packet(code))
-
-    return Packet(ver, typ, sub_packets)
-
-
-def solve():
-    """Solve the puzzle..."""
-    code = parse_input()
-    outer_packet = parse_packet(code)
-    print(outer_packet.ver_total())
-    print(outer_packet.evaluate())
-
-
-solve()
+        sub_packet_count = code.read(pos + 1, 11)
+        pos += 12
+        for _ in range(sub_packet_count):
+            sub_packet, pos = parse_packet(code, pos)
+            sub_packets.append(sub_packet)
+
+    return Packet(ver, typ, sub_packets), pos
+
+
+def decode_transmission() -> Packet:
+    """Decode the transmission into its outermost packet."""
+    packet, _ = parse_packet(parse_input())
+    return packet
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return decode_transmission().ver_total()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return decode_transmission().evaluate()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -1,8 +1,9 @@
 """Paul's solution for AOC day 17."""
 
-from typing import List, Tuple, Iterator
+from typing import List
 
-from lib import data_lines
+from lib import data_ints, run_cached
+from sets import Box, BoxSet, IntervalSet
 
 
 def parse_input() -> List[int]:
@@ -12,97 +13,67 @@ def parse_input() -> List[int]:
 
         target area: x=20..30, y=-10..-5
     """
-    line = next(data_lines(__file__))
-    _, _, s = line.partition(': ')
-    xs, _, ys = s.partition(', ')
-    _, _, xs = xs.partition('=')
-    _, _, ys = ys.partition('=')
-    xss, _, xes = xs.partition('..')
-    yss, _, yes = ys.partition('..')
-
-    return [int(s) for s in (xss, xes, yss, yes)]
-
-
-class Trajectory:
-    """Information about a probe trajectory."""
-    def __init__(
-            self, xvel: int, yvel: int, target: Tuple[int, int , int, int]):
-        self.xvel = xvel
-        self.yvel = yvel
-        self.target = target
-
-        self.max_y = 0
-        for (self.x, _), self.y in zip(x_pos_vel(xvel), y_pos(yvel)):
-            self.max_y = max(self.max_y, self.y)
-            if self.hit or self.overshot_x or self.overshot_y:
-                break
-
-    @property
-    def hit(self) -> bool:
-        """True if this trajectory has hit the target"""
-        xa, xb, ya, yb = self.target
-        return ya <= self.y <= yb and xa <= self.x <= xb
-
-    @property
-    def overshot_x(self) -> bool:
-        """True if this trajectory has overshot right edge of the target"""
-        _, xb, *_= self.target
-        return self.x > xb
-
-    @property
-    def overshot_y(self) -> bool:
-        """True if this trajectory has overshot bottom edge of the target"""
-        *_, ya, _= self.target
-        return self.y < ya
-
-
-def x_pos_vel(initial: int) -> Iterator[int]:
-    """Iterate X position and velocity given an inital velocity."""
-    x = 0
-    xvel = initial
-    while True:
-        yield x, xvel
-        x += xvel
-        if xvel > 0:
-            xvel -= 1
-
-
-def y_pos(initial: int) -> Iterator[int]:
-    """Iterate Y position given an inital velocity."""
-    y = 0
-    yvel = initial
-    while True:
-        yield y
-        y += yvel
-        yvel -= 1
-
-
-def solve():
-    """Solve the puzzle..."""
-    target = parse_input()
-    xa, xb, ya, _ = target
-
-    # Work out viable range of initial X velocities.
-    possible_xvels = []
-    for xvel in range(0, xb + 1):
-        for x, xv in x_pos_vel(xvel):
-            if xa <= x <= xb:
-                possible_xvels.append(xvel)
-                break
-            if (x < xa and xv == 0) or x > xb:
-                break
-
-    hits = []
-    for xvel in possible_xvels:
-        for yvel in range(ya, -ya):
-            t = Trajectory(xvel, yvel, target)
-            if t.hit:
-                hits.append(t)
-            elif t.overshot_x or t.overshot_y and yvel >= -ya:
-                break
-
-    print(max(t.max_y for t in hits))
-    print(len(hits))
-
-
-solve()
+    return data_ints(__file__, width=4)[0].tolist()
+
+
+def stopping_xvels(xa: int, xb: int) -> IntervalSet:
+    """Find the X velocities for which the probe stops within xa..xb.
+
+    A probe launched with X velocity v stops at x = v(v + 1) / 2.
+    """
+    v = 0
+    while v * (v + 1) // 2 < xa:
+        v += 1
+    start = v
+    while v * (v + 1) // 2 <= xb:
+        v += 1
+    return IntervalSet([(start, v)])
+
+
+@run_cached(__file__, copy=False)
+def find_hits() -> BoxSet:
+    """Find all the initial velocities that hit the target.
+
+    Rather than following trajectories, this works through the steps. After
+    t steps, a probe launched with velocity v has fallen behind t * v by
+    t(t - 1) / 2; for X, until it stops after v steps. So the X velocities
+    that put the probe within the target's X range after t steps are an
+    interval of the still moving velocities, together with those that have
+    stopped within the range. The Y velocities within the target's Y range
+    are also an interval. The hits are the union, over all steps, of these
+    boxes of velocities.
+
+    The target must be to the right and below the launch point. A probe
+    launched upwards with Y velocity v passes back through y = 0 after
+    2v + 1 steps, moving at -(v + 1). So no hit can take longer than the
+    depth of the target times 2.
+
+    Both parts use the hits, so they are found once per run.
+    """
+    xa, xb, ya, yb = parse_input()
+    stopped = stopping_xvels(xa, xb)
+    boxes: List[Box] = []
+    for t in range(1, -2 * ya + 1):
+        fall = t * (t - 1) // 2
+        moving = IntervalSet(
+            [(max(t, -(-(xa + fall) // t)), (xb + fall) // t + 1)])
+        xvels = moving | (stopped & IntervalSet([(0, t)]))
+        yvels = (-(-(ya + fall) // t), (yb + fall) // t + 1)
+        boxes.extend((xr, yvels) for xr in xvels.ranges())
+    return BoxSet.covered(2, boxes)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    top_yvel = int(find_hits().boxes[:, 1, 1].max()) - 1
+    return max(0, top_yvel * (top_yvel + 1) // 2)
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return len(find_hits())
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -4,6 +4,7 @@ from itertools import permutations
 from typing import List, Tuple, Union
 
 from lib import data_lines
+from parallel import parallel_map
 
 Number = List[Union['Number', int]]
 
@@ -120,18 +121,31 @@ def solve():
         n_red = reduce_number(n)
         total = [total, n_red]
         total = reduce_number(total)
-    print(magnitude(total))
+    return magnitude(total)
+
+
+def pair_magnitude(pair: Tuple[Number, Number]) -> int:
+    """Calculate the magnitude of the sum of a pair of numbers."""
+    a, b = pair
+    return magnitude(reduce_number([a, b]))
 
 
 def solve_part2():
     """Solve the puzzle, part 2."""
     numbers = parse_input()
-    max_mag = 0
-    for a, b in permutations(numbers, 2):
-        total: Number = reduce_number([a, b])
-        max_mag = max(magnitude(total), max_mag)
-    print(max_mag)
+    return parallel_map(pair_magnitude, permutations(numbers, 2), max)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return solve()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return solve_part2()
 
 
-solve()
-solve_part2()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -5,7 +5,13 @@ from functools import partial
 from itertools import product, combinations
 from typing import Callable, List, Optional, Tuple
 
-from lib import data_lines
+from lib import (
+    BoundedCache, extract_ints, instruments, mapped_data, run_cached)
+
+# Locating the scanners takes nearly all of either part's time (about 20s
+# for part 2 alone, but no time at all after part 1), so run.py -P should
+# run both parts in the one process.
+PARTS_SHARE_WORK = True
 
 # We use three basic reorientation operations.
 #
@@ -50,6 +56,12 @@ from lib import data_lines
 
 Coord = Tuple[int, int, int]
 
+# The number of entries in each scanner's caches. The offset cache entries
+# are long lists and, unbounded, the offset caches grow to hold millions of
+# integers.
+BEACON_CACHE_SIZE = 64
+OFFSET_CACHE_SIZE = 256
+
 
 def rotate_right(n: int, coord: Coord) -> Coord:
     """Perform rotate right reorientation one or more times."""
@@ -110,19 +122,14 @@ class Scanner:
     A scanner considers the Y axis to extend formward, the X axis to extend to
     the right and the Z axis to extend upward.
     """
-    b_hits = 0
-    b_misses = 0
-    c_hits = 0
-    c_misses = 0
-
     def __init__(self, index, beacons):
         self.index = index
         self.recorded_beacons = list(beacons)
         self.rel_beacons = list(beacons)
         self.orientation = 0
         self.origin: Optional[Coord] = 0, 0, 0
-        self._beacon_cache = {}
-        self._offset_cache = {}
+        self._beacon_cache = BoundedCache(BEACON_CACHE_SIZE)
+        self._offset_cache = BoundedCache(OFFSET_CACHE_SIZE)
 
     def set_orientation(self, orientation: int):
         """Switch to the next possible orientation for this scanner."""
@@ -140,11 +147,12 @@ class Scanner:
     def beacons(self):
         """The beacon positions adjusted by the origin."""
         key = self.orientation, self.origin
-        if key in self._beacon_cache:
-            Scanner.b_hits += 1
-            return self._beacon_cache[key]
+        ret = self._beacon_cache.get(key)
+        if ret is not None:
+            instruments.count('beacon cache hits')
+            return ret
 
-        Scanner.b_misses += 1
+        instruments.count('beacon cache misses')
         xo, yo, zo = self.origin
         ret = [(x + xo, y + yo, z + zo) for x, y, z in self.rel_beacons]
         self._beacon_cache[key] = ret
@@ -156,11 +164,12 @@ class Scanner:
             other, i,
             self.orientation, self.origin,
             other.orientation, other.origin)
-        if key in self._offset_cache:
-            Scanner.c_hits += 1
-            return self._offset_cache[key]
+        ret = self._offset_cache.get(key)
+        if ret is not None:
+            instruments.count('offset cache hits')
+            return ret
 
-        Scanner.c_misses += 1
+        instruments.count('offset cache misses')
         ret = [a[i] - b[i] for a, b in product(self.beacons, other.beacons)]
         self._offset_cache[key] = ret
         return ret
@@ -195,22 +204,14 @@ def parse_input() -> List[Scanner]:
     :return:
         A list of `Scanner` instances.
     """
-    def emit():
-        nonlocal index
-        if coords:
-            scanners.append(Scanner(index, coords))
-            coords[:] = []
-            index += 1
-
-    index = 0
     scanners = []
-    coords = []
-    for line in data_lines(__file__):
-        if line.startswith('--- '):
-            emit()
-        elif line:
-            coords.append(tuple(int(v) for v in line.split(',')))
-    emit()
+    with mapped_data(__file__) as buf:
+        for block in buf[:].split(b'--- scanner'):
+            _, _, body = block.partition(b'\n')
+            coords = extract_ints(body, width=3)
+            if len(coords):
+                beacons = [tuple(coord) for coord in coords.tolist()]
+                scanners.append(Scanner(len(scanners), beacons))
     return scanners
 
 
@@ -266,33 +267,55 @@ def compare_scanners(a: Scanner, b: Scanner) -> Optional[Coord]:
     return None
 
 
-def solve():
-    """Solve the puzzle - part 1."""
+@run_cached(__file__, copy=False)
+def locate_scanners() -> List[Scanner]:
+    """Fix the position and orientation of every scanner.
+
+    Both parts of the puzzle need this and it is slow, so the result is
+    calculated once per run. Neither part modifies the scanners, so they
+    share them rather than taking copies.
+    """
     scanners = parse_input()
     fixed = set(scanners[:1])
     unfixed = set(scanners[1:])
     while unfixed:
         for second, first in product(unfixed, fixed):
-            origin = compare_scanners(first, second)
+            with instruments.timer('compare_scanners'):
+                origin = compare_scanners(first, second)
             if origin:
                 fixed.add(second)
                 unfixed.remove(second)
                 #print(first.index, second.index, origin)
                 break
 
+    return scanners
+
+
+def count_beacons() -> int:
+    """Count the full set of beacons."""
+    scanners = locate_scanners()
     beacons = set(scanners[0].beacons)
     for scanner in scanners[1:]:
         beacons |= set(scanner.beacons)
+    return len(beacons)
 
-    print(len(beacons))
-    print(max(a.manhattan_distance(b) for a, b in combinations(scanners, 2)))
 
+def max_scanner_distance() -> int:
+    """Find the largest Manhattan distance between any two scanners."""
+    scanners = locate_scanners()
+    return max(a.manhattan_distance(b) for a, b in combinations(scanners, 2))
 
-def solve_part2():
-    """Solve the puzzle, part 2."""
-    scanners = parse_input()
-    print(len(list(scanners)))
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return count_beacons()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return max_scanner_distance()
 
 
-solve()
-# solve_part2()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
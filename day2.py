@@ -1,16 +1,17 @@
 """Paul's solution for AOC day 2."""
 
 from itertools import accumulate
-from typing import Iterator, Tuple
+from typing import List, Tuple
 
-from lib import data_lines
+from lib import cached_parse, data_lines
 
 
-def parse_route() -> Iterator[Tuple[int, int]]:
+@cached_parse(__file__)
+def parse_route() -> List[Tuple[int, int]]:
     """Parse the route.
 
     This takes the sequence of route instructions (one per line) and converts
-    it to a sequence of tuples of the form:
+    it to a list of tuples of the form:
 
         (depth_change, distance_change)
 
@@ -18,16 +19,18 @@ def parse_route() -> Iterator[Tuple[int, int]]:
 
         (aim_change, impulse_value)
     """
+    route = []
     for line in data_lines(__file__):
         command, value_str = line.split()
         if command == 'forward':
-            yield 0, int(value_str)
+            route.append((0, int(value_str)))
         elif command == 'down':
-            yield int(value_str), 0
+            route.append((int(value_str), 0))
         elif command == 'up':
-            yield -int(value_str), 0
+            route.append((-int(value_str), 0))
         else:
             raise RuntimeError(f'Unhandled command {command}')
+    return route
 
 
 def calc_position():
@@ -35,7 +38,7 @@ def calc_position():
     depth = sum(d for d, _ in parse_route())
     position = sum(p for _, p in parse_route())
 
-    print(depth * position)
+    return depth * position
 
 
 def calc_position2():
@@ -45,8 +48,19 @@ def calc_position2():
     depth = sum(aim * imp for aim, imp in zip(aims, impulses))
     position = sum(impulses)
 
-    print(depth * position)
+    return depth * position
 
 
-calc_position()
-calc_position2()
+def part1():
+    """Solve part 1 of the puzzle."""
+    return calc_position()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return calc_position2()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -1,123 +1,123 @@
 """Paul's solution for AOC day 20."""
 
-from collections import Counter
-from itertools import chain
-from typing import List, Literal, Tuple
+from functools import partial
+from typing import Tuple
 
-from lib import data_lines, windowize
+import numpy as np                               # pylint: disable=import-error
 
+from lib import Grid, data_lines, offsets9
+from parallel import SharedArray, parallel_map
 
-Bit = Literal[0, 1]
-Program = List[Bit]
-Image = List[List[Bit]]
+lkup = {'#': 1, '.': 0}
 
+# Images with at least this many rows are processed in parallel, in bands of
+# BAND_ROWS rows.
+PARALLEL_MIN_ROWS = 2048
+BAND_ROWS = 256
 
-def parse_input() -> Tuple[Program, Image]:
+
+def parse_input() -> Tuple[np.ndarray, np.ndarray]:
     """Parse the program and image data.
 
     The first line is the program. The 3rd and subsequent lines are rows of the
     image. Within the image and program '#' is 'on' (1) and '.' is 'off' (0).
     """
-    lkup = {'#': 1, '.': 0}
     lines = data_lines(__file__)
-
-    program = [lkup[c] for c in next(lines)]
+    program = Grid.from_lines([next(lines)], lkup=lkup).inner[0]
     next(lines)
-    return program, [[lkup[c] for c in line] for line in lines]
+    return program, Grid.from_lines(lines, lkup=lkup).inner
 
 
-def add_infinity_border(image: Image, pixel: Bit) -> Image:
-    """Add a border to act as the inifinite part of an immage.
+def process(
+        image: np.ndarray, program: np.ndarray, background: int
+    ) -> Tuple[np.ndarray, int]:
+    """Process the image using the program.
 
-    Add a border of 3 pixels around the image to act as a suitable amount of
-    the infinite extent.
+    The image is conceptually surrounded by an infinite area of pixels with
+    the background value. The processed image grows by one pixel on each side
+    and the new background value is returned along with it.
     """
-    ncols = len(image[0]) + 6
-    new_image = [[pixel] * ncols for _ in range(3)]
-    new_image.extend([[pixel] * 3 + row + [pixel] * 3 for row in image])
-    new_image.extend([[pixel] * ncols for _ in range(3)])
-    return new_image
-
-
-def trim_unprocessed_infinity(image: Image) -> Image:
-    """Trim the part of the infinity border that was not processed.
-
-    This is a single pixel border around the image.
+    # The output pixels cover the image plus a 1 pixel border, which requires
+    # a further 1 pixel border of background to supply their neighbours.
+    grown = np.pad(image, 1, constant_values=background)
+    if len(grown) >= PARALLEL_MIN_ROWS:
+        new_image = process_in_bands(grown, program, background)
+    else:
+        new_image = program[pixel_index(grown, background)]
+    new_background = program[511 if background else 0]
+    return new_image, int(new_background)
+
+
+def pixel_index(image: np.ndarray, background: int) -> np.ndarray:
+    """Calculate the program index for each pixel of an image."""
+    grid = Grid(image, pad=1, fill=background)
+    index = np.zeros(image.shape, dtype=np.int16)
+    for pixels in grid.shifted(offsets9):
+        index = (index << 1) | pixels
+    return index
+
+
+def process_band(
+        source: SharedArray, dest: SharedArray, program: np.ndarray,
+        background: int, band: Tuple[int, int]):
+    """Process a band of rows of an image, for `process_in_bands`.
+
+    :band: The start and stop rows of the band.
     """
-    return [row[1:-1] for row in image[1:-1]]
-
-
-def trim_unlit_border(image: Image) -> Image:
-    """Trim any unlit border from the image."""
-    new_image = image
-    for i, row in enumerate(new_image):
-        if any(row):
-            new_image = new_image[i:]
-            break
-    while not any(new_image[-1]):
-        new_image.pop()
-
-    start = min(row.index(1) for row in new_image)
-    for row in new_image:
-        row.reverse()
-    end = min(row.index(1) for row in new_image)
-    for row in new_image:
-        row.reverse()
-
-    n = len(image[0]) - end
-    new_image = [row[start:n] for row in new_image]
-    return new_image
+    start, stop = band
 
+    # Include the rows either side of the band, which supply neighbours.
+    lo, hi = max(start - 1, 0), min(stop + 1, len(source.array))
+    index = pixel_index(source.array[lo:hi], background)
+    dest.array[start:stop] = program[index[start - lo:stop - lo]]
 
-def new_blank_image(image: Image):
-    """Create a new blank image or equal dimensions."""
-    n = len(image[0])
-    return [[0] * n for _ in image]
 
+def process_in_bands(
+        image: np.ndarray, program: np.ndarray, background: int
+    ) -> np.ndarray:
+    """Process a large image in parallel, in bands of rows.
 
-def process(image: Image, program: Program) -> Image:
-    """Process the image using the program."""
-    # pylint: disable=too-many-locals
-
-    result = new_blank_image(image)
-    for ri, (ra, rb, rc) in enumerate(windowize(image, 3), 1):
-        ra_win = windowize(ra, 3)
-        rb_win = windowize(rb, 3)
-        rc_win = windowize(rc, 3)
-        for ci, (ba, bb, bc) in enumerate(zip(ra_win, rb_win, rc_win), 1):
-            n = 0
-            for d in chain(ba, bb, bc):
-                n = (n << 1) | d
-
-            result[ri][ci] = program[n]
-
-    return result
+    The image and result are held in shared memory, so the workers do not
+    need copies.
+    """
+    n = len(image)
+    bands = [(r, min(r + BAND_ROWS, n)) for r in range(0, n, BAND_ROWS)]
+    with SharedArray.from_array(image) as source, SharedArray(
+            image.shape, program.dtype) as dest:
+        work = partial(process_band, source, dest, program, background)
+        parallel_map(work, bands, min_items=2)
+        return dest.array.copy()
 
 
-def dump_image(image: Image, lkup: str = ' #'):
+def dump_image(image: np.ndarray, lkup_str: str = ' #'):
     """Dump aeasily readable version of the image."""
     for row in image:
-        print(''.join(lkup[c] for c in row))
+        print(''.join(lkup_str[c] for c in row))
 
 
 def solve(count: int):
     """Solve the puzzle."""
     program, image = parse_input()
 
-    border_value = 0
-    for i in range(count):
-        image = add_infinity_border(image, border_value)
-        image = process(image, program)
-        image = trim_unprocessed_infinity(image)
-        border_value = image[0][0]
-        if i % 2 == 1:
-            image = trim_unlit_border(image)
+    background = 0
+    for _ in range(count):
+        image, background = process(image, program, background)
 
     # dump_image(image)
 
-    counts = Counter(chain(*image))
-    print(counts[1])
+    return int(image.sum())
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return solve(2)
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return solve(50)
 
 
-solve(2)
-solve(50)
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
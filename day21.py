@@ -69,7 +69,7 @@ def solve():
     while move(0) and move(1):
         pass
 
-    print(min(scores) * die.rolls)
+    return min(scores) * die.rolls
 
 
 def explore_next_move(                     # pylint: disable=too-many-arguments
@@ -116,7 +116,19 @@ def solve2():
         positions=positions, scores=scores, player=0, wins=wins, universes=1,
         trail=[])
 
-    print(max(wins))
+    return max(wins)
 
-solve()
-solve2()
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return solve()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return solve2()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
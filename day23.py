@@ -2,9 +2,8 @@
 
 import sys
 from typing import List, Tuple
-from collections import defaultdict
 
-from lib import data_lines, watch_counter
+from lib import BoundedCache, data_lines, instruments, watch_counter
 
 MAX_COST = 999_999_999_999_999
 
@@ -21,7 +20,8 @@ target_position = {}
 corridor = set(list(target_position.keys())[:11])
 homes = {'A': (2, 2), 'B': (2, 4), 'C': (2, 6), 'D': (2, 8)}
 
-positions = defaultdict(lambda: MAX_COST)
+# The lowest cost found so far for each position that has been reached.
+positions = BoundedCache(1 << 18)
 
 
 class saved_state:
@@ -252,7 +252,7 @@ def all_home_moves(position):
 def seen(position, cost, check_only=True):
     """Check if a position has already been seen."""
     k = tuple(position.items())
-    if positions[k] <= cost:
+    if positions.get(k, MAX_COST) <= cost:
         return True
     if check_only:
         return False
@@ -290,11 +290,11 @@ def thingy(position, cost_so_far, min_cost, found, level=0):
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-branches
     #next(wc)
+    instruments.count('positions visited')
     if seen(position, cost_so_far, check_only=False):
+        instruments.count('pruned as seen')
         return min_cost
 
-    if debug:
-        print("--------------------------")
     with saved_state(position):
         # Move as many amphipods home as possible.
         #print("Find home moves:")
@@ -309,6 +309,7 @@ def thingy(position, cost_so_far, min_cost, found, level=0):
             position[a] = ' '
             #dump_pos(position)
             if cost_so_far + homing_cost > min_cost:
+                instruments.count('pruned while homing')
                 return min_cost
             home_moves = all_home_moves(position)
             #print(home_moves)
@@ -316,10 +317,9 @@ def thingy(position, cost_so_far, min_cost, found, level=0):
         # After moving amphipods home we mmay be finished.
         if position == target_position:
             new_cost = cost_so_far + homing_cost
-            if debug:
-                print(":New home:")
+            instruments.count('solutions found')
             if new_cost < min_cost:
-                print(f'NEW BEST: L={level} C={new_cost} M={min_cost}')
+                instruments.count('new best solutions')
                 min_cost = new_cost
                 found.append(min_cost)
             return min_cost
@@ -329,20 +329,14 @@ def thingy(position, cost_so_far, min_cost, found, level=0):
         pm = all_exit_moves(position)
         cost_so_far += homing_cost
         if not pm:
+            instruments.count('dead ends')
             add_dead_positions(position, cost_so_far)
             # return min_cost
 
-        if debug:
-            print("Exploring from:")
-            here_before = seen(position, cost_so_far)
-            dump_pos(position)
-            print(f'  {level=} {cost_so_far=} {min_cost=} {here_before=}')
-            for m in pm:
-                print('   ', m)
-
         for cost, a, b in pm:
             new_cost = cost_so_far + cost
             if new_cost > min_cost:
+                instruments.count('pruned exit moves')
                 continue
 
             with saved_state(position):
@@ -358,29 +352,29 @@ def solve(room_size):
     """Solve the puzzle."""
     # pylint: disable=unused-variable
     create_target_position(room_size)
-    print("----------")
-    dump_pos(target_position)
     create_move_sets(room_size)
     position = parse_input(room_size)
     found = []
     positions.clear()
-    min_cost = thingy(position, 0, MAX_COST, found)
-    print(min_cost)
-    if debug:
-        for coord, ent in exit_move_sets.items():
-            print(coord)
-            for move in ent:
-                print("   ", move)
-        for a, move_sets in home_move_sets.items():
-            print(a)
-            for coord, ent in move_sets.items():
-                print("   ", coord)
-                for move in ent:
-                    print("       ", move)
+    with instruments.timer(f'search (room size {room_size})'):
+        min_cost = thingy(position, 0, MAX_COST, found)
+    return min_cost
 
 
 exit_move_sets = {}
 home_move_sets = {}
-debug = True
-# solve(2)
-solve(4)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return solve(2)
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return solve(4)
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
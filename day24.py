@@ -1,5 +1,7 @@
 """Paul's solution for AOC day 24."""
 
+from lib import memoize
+
 # Analysys
 #
 # The code for each digit is the same except for some literal values, (shown
@@ -88,7 +90,6 @@ literals = (
     (-10, 14, 26),
     (-9, 10, 26),
 )
-mem = {}
 
 
 def calc_q(zp, d, a):
@@ -101,12 +102,9 @@ def calc_z(zp, d, q, b, c):
     return (zp // c) * (q * 25 + 1) + (d + b) * q
 
 
+@memoize(maxsize=1 << 18)
 def find_rem_sequences(zp: int, step: int, n: int, rng):
     """Try the next potential set of digits."""
-    k = zp, step
-    if k in mem:
-        return mem[k]
-
     a, b, c = literals[step]
     choices = [(d, calc_q(zp, d, a)) for d in rng]
     if c == 26:
@@ -117,9 +115,7 @@ def find_rem_sequences(zp: int, step: int, n: int, rng):
         return []
 
     if step == n - 1:
-        choices = [[d] for d, q in choices if calc_z(zp, d, q, b, c) == 0]
-        mem[k] = choices
-        return choices
+        return [[d] for d, q in choices if calc_z(zp, d, q, b, c) == 0]
 
     ret = []
     for d, q in choices:
@@ -128,16 +124,31 @@ def find_rem_sequences(zp: int, step: int, n: int, rng):
             ret.append([d] + seq)
             if ret:
                 return ret
-    mem[k] = ret
     return ret
 
 
-def solve():
-    """Solve the puzzle."""
+def find_largest():
+    """Find the largest valid model number."""
     solutions = find_rem_sequences(0, 0, 14, range(9, 0, -1))
-    print(''.join(str(d) for d in solutions[0]))
+    return ''.join(str(d) for d in solutions[0])
+
+
+def find_smallest():
+    """Find the smallest valid model number."""
     solutions = find_rem_sequences(0, 0, 14, range(1, 10))
-    print(''.join(str(d) for d in solutions[-1]))
+    return ''.join(str(d) for d in solutions[-1])
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_largest()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_smallest()
 
 
-solve()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
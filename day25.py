@@ -2,57 +2,66 @@
 
 import numpy as np                               # pylint: disable=import-error
 
-from lib import data_lines, windowize
+from lib import Grid
 
+EMPTY, EAST, SOUTH = 0, 1, 2
+lkup = {'.': EMPTY, '>': EAST, 'v': SOUTH}
 
-def half_step(grid, sc):
-    """Perform half of a single step."""
-    n = 0
-    for row in grid:
-        to_move = [
-            i for i, (a, b) in enumerate(windowize(row, 2))
-            if a == sc and b == '.']
-        if row[0] == '.' and row[-1] == sc:
-            row[0] = row[-1]
-            row[-1] = '.'
-            n += 1
-        for i in to_move:
-            row[i + 1] = row[i]
-            row[i] = '.'
-            n += 1
 
-    return n
+def half_step(grid: np.ndarray, herd: int) -> int:
+    """Perform half of a single step.
+
+    Every member of the herd that has an empty cell to its right moves into
+    it, wrapping around at the end of each row. Pass the transposed grid to
+    move the south facing herd.
+
+    :return: The number of sea cucumbers that moved.
+    """
+    movers = (grid == herd) & (np.roll(grid, -1, axis=1) == EMPTY)
+    grid[movers] = EMPTY
+    grid[np.roll(movers, 1, axis=1)] = herd
+    return int(movers.sum())
 
 
 def dump(grid):
     """Print the sea cucumber grid."""
     for row in grid:
-        print(''.join(row))
+        print(''.join('.>v'[c] for c in row))
     print("----------")
 
 
 def solve():
     """Solve the puzzle."""
-    lines = list(data_lines(__file__))
-    nx = len(lines[0])
-    ny = len(lines)
-    print(nx, ny)
-    grid = np.array([list(line) for line in lines])
-
+    grid = Grid.from_data(__file__, lkup=lkup).inner
     t_grid = grid.T
-    dump(grid)
 
     n = 1
     i = 0
     while n > 0:
-        n = half_step(grid, '>')
-        n += half_step(t_grid, 'v')
+        n = half_step(grid, EAST)
+        n += half_step(t_grid, SOUTH)
         i += 1
         # print(i, n)
         # dump(grid)
 
-    dump(grid)
-    print(i)
+    return i
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return solve()
+
+
+def part2():
+    """Solve part 2 of the puzzle.
+
+    Day 25 only has one puzzle; the second star is awarded for completing all
+    the others. So this provides a fixed answer, allowing day 25 to be run
+    like every other solver.
+    """
+    return 'Merry Christmas'
 
 
-solve()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
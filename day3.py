@@ -1,81 +1,83 @@
 """Paul's solution for AOC day 3."""
 
-from collections import Counter
-from itertools import count
-from typing import Counter as CounterType, Iterable, List
+from typing import List, Tuple
 
-from lib import data_lines
+from lib import BitVector, data_lines
 
 
-def parse_diagnotic_data() -> Iterable[List[str]]:
+def parse_diagnotic_data() -> Tuple[List[str], List[BitVector]]:
     """Parse the diagnostic data.
 
-    This takes a sequence of binary values (one per line) and converts it
-    to a sequence of tuples of the form:
-
-        (b1, b2, b3, ...)
-
-    Where b1 is the leftmost bit, b2 is the second bit, etc. Each value
-    is left as a string value.
+    This takes a sequence of binary values (one per line). As well as the
+    values, as strings, it provides a bit vector for each bit position, with
+    a bit for each value. So the bits of a position can be counted, or the
+    values filtered on them, with a single operation.
     """
-    for line in data_lines(__file__):
-        yield list(line.strip())
-
+    values = [line.strip() for line in data_lines(__file__)]
+    columns = [
+        BitVector.from_string(''.join(column)) for column in zip(*values)]
+    return values, columns
 
-def count_bits(bit_strings: Iterable[List[str]]) -> List[CounterType[str]]:
-    """Count the number of ones and zeros in each bit position."""
-    for i, bits in enumerate(bit_strings):
-        if not i:
-            counters = [Counter({'0': 0, '1': 0}) for _ in bits]
-        for b, counter in zip(bits, counters):
-            counter[b] += 1
 
-    return counters
+def select_life_support_value(
+        values: List[str], columns: List[BitVector], most_common: bool):
+    """Select a life support value from the data.
 
+    The values are repeatedly filtered, position by position, keeping those
+    with the most (or least) common bit value in that position. A tie selects
+    the values with a 1 (or 0).
 
-def selector(bit_values, bit, cidx, fallback):
-    """Obtains the selector for given bit position."""
-    counts = count_bits(bit_values)[bit].most_common()
-    if counts[0][1] == counts[1][1]:
-        return fallback
-    else:
-        return counts[cidx][0]
-
-
-def select_life_support_value(bit_values, cidx, fallback):
-    """Select a life support value from the data."""
-    bit_values = list(bit_values)
-    for i in count():
-        sel = selector(bit_values, i, cidx, fallback)
-        bit_values = [bits for bits in bit_values if bits[i] == sel]
-        if len(bit_values) == 1:
-            return int(''.join(bit_values[0]), 2)
+    :values:      The values, as strings.
+    :columns:     The bit vector for each position.
+    :most_common: Set to select the most common, rather than least common,
+                  bit values.
+    """
+    remaining = ~BitVector(0, len(values))
+    for column in columns:
+        ones = remaining & column
+        count, ones_count = remaining.popcount(), ones.popcount()
+        if (ones_count * 2 >= count) == most_common:
+            remaining = ones
+        else:
+            remaining = remaining & ~column
+        if remaining.popcount() == 1:
+            return int(values[str(remaining).index('1')], 2)
 
     raise RuntimeError('Unreachable code!!!')
 
 
 def calc_power():
     """Calculate diagnostic power."""
-    counters = count_bits(parse_diagnotic_data())
-    gamma_bin = [counter.most_common(1)[0][0] for counter in counters]
-    epsilon_bin = [counter.most_common()[-1][0] for counter in counters]
+    values, columns = parse_diagnotic_data()
+    gamma = BitVector.from_string(''.join(
+        '1' if column.popcount() * 2 > len(values) else '0'
+        for column in columns))
+    epsilon = ~gamma
 
-    gamma = int(''.join(gamma_bin), 2)
-    epsilon = int(''.join(epsilon_bin), 2)
-
-    print(gamma * epsilon)
+    return int(gamma) * int(epsilon)
 
 
 def calc_life_support_rating():
     """Calculate diagnostic life support rating."""
-    bit_values = list(parse_diagnotic_data())
+    values, columns = parse_diagnotic_data()
     oxygen_genrator_rating = select_life_support_value(
-        bit_values, cidx=0, fallback='1')
+        values, columns, most_common=True)
     co2_scrubber_rating = select_life_support_value(
-        bit_values, cidx=1, fallback='0')
+        values, columns, most_common=False)
+
+    return oxygen_genrator_rating * co2_scrubber_rating
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return calc_power()
+
 
-    print(oxygen_genrator_rating * co2_scrubber_rating)
+def part2():
+    """Solve part 2 of the puzzle."""
+    return calc_life_support_rating()
 
 
-calc_power()
-calc_life_support_rating()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
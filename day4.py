@@ -3,7 +3,7 @@
 from itertools import chain
 from typing import List, Tuple, Iterator
 
-from lib import data_lines
+from lib import cached_parse, data_lines, run_cached
 
 
 class Card:
@@ -35,6 +35,8 @@ class Card:
         yield from (v for v in chain(*self.lines) if v not in all_marked)
 
 
+@run_cached(__file__)
+@cached_parse(__file__)
 def parse_bingo_data() -> Tuple[List[int], List[Card]]:
     """Parse the bingo data.
 
@@ -59,8 +61,8 @@ def find_winning_card():
     for v in drawn_values:
         for card in cards:
             if card.mark(v):
-                print(sum(card.unmarked()) * v)
-                return
+                return sum(card.unmarked()) * v
+    return None
 
 
 def find_worst_card():
@@ -72,9 +74,20 @@ def find_worst_card():
             if card.mark(v):
                 rem_cards.discard(card)
                 if not rem_cards:
-                    print(sum(card.unmarked()) * v)
-                    return
+                    return sum(card.unmarked()) * v
+    return None
 
 
-find_winning_card()
-find_worst_card()
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_winning_card()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_worst_card()
+
+
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -2,9 +2,10 @@
 
 from dataclasses import dataclass
 from itertools import cycle
-from typing import Iterator, Sequence, Iterable
+from typing import Iterator, List, Sequence, Iterable, Tuple
 
-from lib import data_lines
+from lib import cached_parse, data_lines
+from sets import BoxSet
 
 
 @dataclass
@@ -53,6 +54,13 @@ class Vector:
         a, b = self.a, self.b
         return a.x == b.x or a.y == b.y
 
+    def box(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """The (start, stop) bounds of the smallest box holding this vector."""
+        a, b = self.a, self.b
+        return (
+            (min(a.x, b.x), max(a.x, b.x) + 1),
+            (min(a.y, b.y), max(a.y, b.y) + 1))
+
     @property
     def max_x(self) -> int:
         """Maximum X coordinate."""
@@ -72,12 +80,13 @@ def fs_range(a: int, b:int) -> range:
         return range(a, b + 1)
 
 
-def parse_vent_data() -> Iterator[Vector]:
+@cached_parse(__file__)
+def parse_vent_data() -> List[Vector]:
     """Parse the vent data.
 
-    This reads in each vector value, yielding Vector instances.
+    This reads in each vector value, returning a list of Vector instances.
     """
-    yield from (Vector.from_string(line) for line in data_lines(__file__))
+    return [Vector.from_string(line) for line in data_lines(__file__)]
 
 
 def get_vector_hits(vectors: Sequence[Vector], inc_diagonal=False) -> int:
@@ -99,15 +108,37 @@ def get_vector_hits(vectors: Sequence[Vector], inc_diagonal=False) -> int:
     return x_dim * y_dim - zeros - ones
 
 
+def get_axis_vector_hits(vectors: Sequence[Vector]) -> int:
+    """Work out the number of points crossed by 2 or more vectors.
+
+    Only vertical and horizontal vectors are considered. Each of these covers
+    a box of points, so the points crossed more than once are found as a set
+    of boxes, rather than by visiting every point.
+    """
+    boxes = [v.box() for v in vectors if v.is_vertical_or_horizontal()]
+    return len(BoxSet.covered(2, boxes, depth=2))
+
+
 def find_scary_vent_points():
     """Find the most scary vent positions."""
-    print(get_vector_hits(list(parse_vent_data())))
+    return get_axis_vector_hits(parse_vent_data())
 
 
 def find_scary_vent_points2():
     """Find the most scary vent positions."""
-    print(get_vector_hits( list(parse_vent_data()), inc_diagonal=True))
+    return get_vector_hits(parse_vent_data(), inc_diagonal=True)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return find_scary_vent_points()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_scary_vent_points2()
 
 
-find_scary_vent_points()
-find_scary_vent_points2()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -2,7 +2,9 @@
 
 from collections import deque
 
-from lib import data_lines
+import numpy as np                               # pylint: disable=import-error
+
+from lib import data_ints
 
 
 def parse_fish_data() -> deque[int]:
@@ -14,11 +16,8 @@ def parse_fish_data() -> deque[int]:
         with count == 0. Each entry is simply the number of fish with the given
         count.
     """
-    data_line = list(data_lines(__file__))[0]
-    population = [0] * 9
-    for v in (int(sv) for sv in data_line.split(',')):
-        population[v] += 1
-    return deque(reversed(population))
+    population = np.bincount(data_ints(__file__), minlength=9)
+    return deque(reversed(population.tolist()))
 
 
 def get_population(num_days):
@@ -28,8 +27,19 @@ def get_population(num_days):
         births = fishes[-1]
         fishes.rotate()
         fishes[2] += births
-    print(f'{sum(fishes):_d}')
+    return f'{sum(fishes):_d}'
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return get_population(80)
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return get_population(256)
 
 
-get_population(80)
-get_population(256)
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
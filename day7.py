@@ -1,9 +1,11 @@
 """Paul's solution for AOC day 7."""
 
 from collections import Counter
-from typing import Counter as CounterType, Dict, Tuple
+from functools import partial
+from typing import Counter as CounterType, Dict
 
-from lib import data_lines
+from lib import data_ints
+from parallel import parallel_map
 
 
 def parse_position_data() -> CounterType[Dict[int, int]]:
@@ -13,38 +15,47 @@ def parse_position_data() -> CounterType[Dict[int, int]]:
         A Counter mapping from position to the number of crabs submarines in
         that position.
     """
-    positions: CounterType = Counter()
-    for line in data_lines(__file__):
-        positions.update(int(sv) for sv in line.split(','))
-    return positions
+    return Counter(data_ints(__file__).tolist())
+
+
+def linear_cost(positions: CounterType[int], p: int) -> int:
+    """The fuel cost of moving to p, when each step costs 1."""
+    return sum(n * abs(q - p) for q, n in positions.items())
+
+
+def triangular_cost(positions: CounterType[int], p: int) -> int:
+    """The fuel cost of moving to p, when each step costs 1 more."""
+    def tri(v):
+        return v * (v + 1) // 2
+
+    return sum(n * tri(abs(q - p)) for q, n in positions.items())
 
 
 def get_best_position():
     """Find the most scary position positions."""
     positions = parse_position_data()
-
-    def position_cost(p: int) -> Tuple[int, int]:
-        return sum(n * abs(q - p) for q, n in positions.items()), p
-
     a, b = 1, max(positions.keys()) + 1
-    fuel, _ = min(position_cost(p) for p in range(a, b))
-    print(fuel)
+    return parallel_map(partial(linear_cost, positions), range(a, b), min)
 
 
 def get_best_position2():
     """Find the most scary position positions."""
     positions = parse_position_data()
+    a, b = 1, max(positions.keys()) + 1
+    return parallel_map(
+        partial(triangular_cost, positions), range(a, b), min)
 
-    def position_cost(p: int) -> Tuple[int, int]:
-        def tri(v):
-            return v * (v + 1) // 2
 
-        return sum(n * tri(abs(q - p)) for q, n in positions.items()), p
+def part1():
+    """Solve part 1 of the puzzle."""
+    return get_best_position()
 
-    a, b = 1, max(positions.keys()) + 1
-    fuel, _ = min(position_cost(p) for p in range(a, b))
-    print(fuel)
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return get_best_position2()
 
 
-get_best_position()
-get_best_position2()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
@@ -3,6 +3,7 @@
 from typing import Iterator, Tuple
 
 from lib import data_lines
+from parallel import parallel_map
 
 # Crib from the puzzle page.
 #
@@ -107,19 +108,32 @@ def count_easy_digits():
     res = sum(
         (sum(1 for d in digit_data if len(d) in (2, 3, 4, 7))
             for _, digit_data in segment_data))
-    print(res)
+    return res
+
+
+def display_value(entry: Tuple) -> int:
+    """Decypher the value displayed for a (preamble, digit_data) entry."""
+    preamble, digit_data = entry
+    coding = decypher_digits(preamble)
+    display = [coding[c] for c in digit_data]
+    return int(''.join(display))
 
 
 def sum_values():
     """Calculate the sum of all the displayed values."""
-    segment_data = list(parse_segment_data())
-    tot = 0
-    for preamble, digit_data in segment_data:
-        coding = decypher_digits(preamble)
-        display = [coding[c] for c in digit_data]
-        tot += int(''.join(display))
-    print(tot)
+    return parallel_map(display_value, parse_segment_data(), sum)
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return count_easy_digits()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return sum_values()
 
 
-count_easy_digits()
-sum_values()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
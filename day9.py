@@ -1,42 +1,37 @@
 """Paul's solution for AOC day 9."""
 
-from typing import List
+from typing import Iterator, Tuple
 
-from lib import data_lines, windowize
+import numpy as np                               # pylint: disable=import-error
 
+from lib import Grid
 
-def parse_heightmap_data() -> List[List[int]]:
+
+def parse_heightmap_data() -> Grid:
     """Parse the cave floor heightmap data.
 
-    Each line is turned into a simple sequence of integer values in the range 0
-    to 9 and then a value of 9 is added at either end to represent the cave
-    side walls. Start and end sequences of [9, 9, 9, ...] are also added
-    to represent the front and back cave walls.
+    Each line is turned into a row of integer values in the range 0 to 9. A
+    border of 9s is added to represent the cave walls.
+    """
+    return Grid.from_data(__file__, pad=1, fill=9)
+
+
+def find_low_points(floor: Grid) -> Iterator[Tuple[int, int, int]]:
+    """Find all the low point on the floor.
+
+    This yields (height, row, column) tuples. The row and column are indices
+    into the padded ``floor.array``.
     """
-    data: List[List[int]] = [[]]
-    for line in data_lines(__file__):
-        data.append([9] + [int(c) for c in line.strip()] + [9])
-    w = len(data[1])
-    data[0] = [9] * w
-    data.append([9] * w)
-    return data
-
-
-def find_low_points(floor_heights):
-    """Find all the low point on the floor."""
-    row_triplets = windowize(floor_heights, 3)
-    for ri, (behind, row, infront) in enumerate(row_triplets):
-        for ci, (a, v, b) in enumerate(windowize(row, 3)):
-            if v < a and v < b:
-                c, d = behind[ci+1], infront[ci+1]
-                if v < c and v < d:
-                    yield v, ri + 1, ci + 1
+    heights = floor.inner
+    is_low = np.logical_and.reduce([heights < n for n in floor.neighbours()])
+    for r, c in zip(*np.nonzero(is_low)):
+        yield int(heights[r, c]), int(r) + 1, int(c) + 1
 
 
 def calc_risk_total():
     """Calculate the risk total for the cave floor."""
-    floor_heights = parse_heightmap_data()
-    print(sum(v + 1 for v, r, c in find_low_points(floor_heights)))
+    floor = parse_heightmap_data()
+    return sum(v + 1 for v, r, c in find_low_points(floor))
 
 
 def find_basin_heighbours(floor_heights, r, c, known):
@@ -59,15 +54,28 @@ def find_basin_heighbours(floor_heights, r, c, known):
 
 def find_basins():
     """Find the basins around each low point."""
-    floor_heights = parse_heightmap_data()
+    floor = parse_heightmap_data()
+    # The basin search is scalar code, for which nested lists are faster.
+    floor_heights = floor.array.tolist()
     basins = []
-    for _, r, c in find_low_points(floor_heights):
+    for _, r, c in find_low_points(floor):
         found = find_basin_heighbours(floor_heights, r, c, set([(r, c)]))
         basins.append(found)
 
     *_, a, b, c = sorted([len(b) for b in basins])
-    print(a * b * c)
+    return a * b * c
+
+
+def part1():
+    """Solve part 1 of the puzzle."""
+    return calc_risk_total()
+
+
+def part2():
+    """Solve part 2 of the puzzle."""
+    return find_basins()
 
 
-calc_risk_total()
-find_basins()
+if __name__ == '__main__':
+    print(part1())
+    print(part2())
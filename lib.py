@@ -1,38 +1,798 @@
 """Some common code for the Advent of Code puzzle solvers."""
 
+import atexit
+import bz2
+import functools
+import gzip
+import hashlib
+import inspect
+import io
+import json
+import lzma
+import mmap
 import os
+import pickle
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import ExitStack, contextmanager, nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import Iterator, Sequence, TypeVar, Tuple
+from typing import (
+    IO, Any, Callable, ContextManager, Dict, Generic, Hashable, Iterable,
+    Iterator, List, Mapping, NamedTuple, Optional, Sequence, TypeVar, Tuple,
+    Union, overload)
+
+import numpy as np                               # pylint: disable=import-error
 
 T = TypeVar('T')
+U = TypeVar('U')
+
+Offset = Tuple[int, int]
+
+# Neighbour offsets, as (row, column) deltas, for use with `Grid.shifted`.
+offsets4: Tuple[Offset, ...] = ((-1, 0), (0, -1), (0, 1), (1, 0))
+offsets8: Tuple[Offset, ...] = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1))
+# The full 3x3 block, including the centre, in row major order.
+offsets9: Tuple[Offset, ...] = tuple(
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+
+# Maps the bytes that can be part of an integer to themselves and all others
+# to a space, for `extract_ints`.
+_int_chars = bytes(
+    c if chr(c) in '-0123456789' else ord(' ') for c in range(256))
+
+# Openers for compressed data files, by file suffix.
+decompressors: Dict[str, Callable[..., io.BufferedIOBase]] = {
+    '.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+# The buffer size used when reading compressed data files and the size of
+# the blocks read by a prefetching `data_lines`.
+DATA_BLOCK_SIZE = 1024 * 1024
+
+# The number of blocks a prefetching `data_lines` may read ahead.
+PREFETCH_BLOCKS = 4
 
+# The maximum total size of the parse cache directory. The least recently
+# used entries are removed when this is exceeded.
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
 
-def data_lines(py_file_name: str) -> Iterator[str]:
+# The modules whose classes may appear in cached parse results, so a change
+# to any of them invalidates the parse cache.
+SHARED_MODULES = ('lib.py', 'parallel.py', 'sets.py')
+
+
+def data_path(py_file_name: str) -> Path:
+    """Find the data file for a puzzle solver.
+
+    So, for example, if py_file_name is 'aoc/day1.py' then the path
+    'data/day1.txt' is returned. The 'data' directory can be overridden using
+    the AOC_DEVEL environment variable. If the AOC_INPUT environment variable
+    is set, it names the data file to use, whatever the solver.
+
+    If the plain text file does not exist, but a compressed version does
+    (for example 'data/day1.txt.gz'; see `decompressors`), then the
+    compressed file's path is returned.
+
+    :py_file_name: The name of the solver's python file.
+    """
+    explicit_path = os.environ.get('AOC_INPUT')
+    if explicit_path:
+        return Path(explicit_path)
+    data = os.environ.get('AOC_DEVEL', 'data')
+    path = Path(data) / f'{Path(py_file_name).stem}.txt'
+    if not path.exists():
+        for suffix in decompressors:
+            compressed_path = path.with_name(path.name + suffix)
+            if compressed_path.exists():
+                return compressed_path
+    return path
+
+
+def open_data(path: Union[Path, str], binary: bool = False) -> IO:
+    """Open a data file, decompressing it if necessary.
+
+    A file with a suffix listed in `decompressors` is decompressed as it is
+    read, in blocks of DATA_BLOCK_SIZE bytes.
+
+    :path:   The data file.
+    :binary: Set to open in binary mode, rather than as UTF-8 text.
+    """
+    opener = decompressors.get(Path(path).suffix)
+    if opener is None:
+        return open(path, 'rb') if binary else open(path, encoding='utf8')
+    f = io.BufferedReader(opener(path, 'rb'), buffer_size=DATA_BLOCK_SIZE)
+    return f if binary else io.TextIOWrapper(f, encoding='utf8')
+
+
+def data_lines(
+        py_file_name: str, path: Optional[Path] = None,
+        prefetch: Optional[bool] = None) -> Iterator[str]:
     """Iterate through the lines for a puzzle solver's data file.
 
     This should be invoked as ``data_lines(__file__)``. The py_file_name is
     used to find the data file. So, for example, if py_file_name is
-    'aoc/day1.py' then the file 'data/day1.txt' will be read.
+    'aoc/day1.py' then the file 'data/day1.txt' will be read. Compressed data
+    files are decompressed on the fly; see `open_data`.
+
+    When prefetching, a background thread reads and decodes blocks of lines
+    ahead of the caller, so that reading overlaps with the caller's parsing.
+    This helps for slow (cold or network) storage.
 
     :py_file_name: The name of the solver;s python file.
+    :path:         If provided, the file to read instead of the solver's data
+                   file.
+    :prefetch:     Set to prefetch lines using a background thread. If not
+                   provided, prefetching is used if the AOC_PREFETCH
+                   environment variable is set.
     """
-    data = os.environ.get('AOC_DEVEL', 'data')
-    with open(f'{data}/{Path(py_file_name).stem}.txt', encoding='utf8') as f:
+    path = path or data_path(py_file_name)
+    if prefetch is None:
+        prefetch = bool(os.environ.get('AOC_PREFETCH'))
+    if prefetch:
+        return iter(PrefetchedLines(path))
+    return _read_lines(path)
+
+
+def _read_lines(path: Path) -> Iterator[str]:
+    """Iterate through the lines of a data file."""
+    with open_data(path) as f:
         for line in f:
             yield line.rstrip()
 
 
+class PrefetchedLines:
+    """A data file's lines, which are read in the background.
+
+    A thread, started on creation, reads blocks of about DATA_BLOCK_SIZE
+    bytes, splits them into right stripped lines and queues them, staying up
+    to PREFETCH_BLOCKS blocks ahead. Any error reading the file is raised
+    when iterating. The thread stops early if iteration is abandoned or this
+    is garbage collected.
+
+    :path: The data file.
+    """
+    def __init__(self, path: Path):
+        self.blocks: queue.Queue = queue.Queue(maxsize=PREFETCH_BLOCKS)
+        self.stop = threading.Event()
+        # The thread must not refer to self, so that dropping this stops the
+        # thread.
+        threading.Thread(
+            target=self._read, args=(path, self.blocks, self.stop),
+            daemon=True).start()
+
+    @staticmethod
+    def _read(path: Path, blocks: queue.Queue, stop: threading.Event):
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    blocks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            with open_data(path) as f:
+                while True:
+                    block = f.readlines(DATA_BLOCK_SIZE)
+                    if not block:
+                        break
+                    if not put([line.rstrip() for line in block]):
+                        return
+        except Exception as exc:             # pylint: disable=broad-except
+            put(exc)
+        else:
+            put(None)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            while True:
+                block = self.blocks.get()
+                if block is None:
+                    return
+                if isinstance(block, Exception):
+                    raise block
+                yield from block
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop reading ahead."""
+        self.stop.set()
+
+    __del__ = close
+
+
+@contextmanager
+def mapped_data(
+        py_file_name: str, path: Optional[Path] = None,
+        prefetch: Optional[bool] = None
+    ) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Memory map a puzzle solver's data file.
+
+    This should be invoked as ``with mapped_data(__file__) as buf:``. The
+    buffer supports slicing, ``find``, ``readline``, etc. and can be searched
+    directly using a bytes regular expression. No decoding is performed.
+
+    A compressed data file cannot be mapped, so it is decompressed into
+    memory and provided as bytes, which supports the same operations.
+
+    When prefetching, the kernel is advised that the whole mapping will soon
+    be read sequentially, so it can read ahead rather than as each page is
+    touched.
+
+    :py_file_name: The name of the solver's python file.
+    :path:         If provided, the file to map instead of the solver's data
+                   file.
+    :prefetch:     Set to prefetch the mapped file. If not provided,
+                   prefetching is used if the AOC_PREFETCH environment
+                   variable is set.
+    """
+    path = Path(path or data_path(py_file_name))
+    if path.suffix in decompressors:
+        with open_data(path, binary=True) as f:
+            yield f.read()
+        return
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # An empty file cannot be mapped.
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if prefetch is None:
+                prefetch = bool(os.environ.get('AOC_PREFETCH'))
+            if prefetch and hasattr(mmap, 'MADV_WILLNEED'):
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+                buf.madvise(mmap.MADV_WILLNEED)
+            yield buf
+
+
+def data_byte_lines(py_file_name: str) -> Iterator[bytes]:
+    """Iterate through the lines for a puzzle solver's data file, as bytes.
+
+    This is a faster alternative to `data_lines` for solvers that do not need
+    decoded text; ``int`` and ``split``, for example, work directly on bytes.
+    The lines are sliced from the memory mapped file (see `mapped_data`),
+    which is closed as soon as the iteration finishes or is abandoned.
+    """
+    stack = ExitStack()
+    try:
+        buf = stack.enter_context(mapped_data(py_file_name))
+        start = 0
+        end = len(buf)
+        while start < end:
+            stop = buf.find(b'\n', start)
+            if stop < 0:
+                stop = end
+            yield buf[start:stop].rstrip()
+            start = stop + 1
+    finally:
+        stack.close()
+
+
+def extract_ints(
+        text: Union[bytes, mmap.mmap, str],
+        width: Optional[int] = None) -> np.ndarray:
+    """Extract all the integers from some text, in a single pass.
+
+    An integer is a run of decimal digits, optionally preceded by a minus
+    sign. Everything else is treated as a separator, so 'x=-3..12' yields -3
+    and 12. All other bytes are mapped to spaces, in one translation, and
+    NumPy then parses the whole buffer; so there are no per-token Python
+    calls.
+
+    :text:  The text; for example the buffer provided by `mapped_data`.
+    :width: If provided, the result is reshaped into records (rows) of this
+            many integers.
+    :return:
+        A NumPy array of int64; one dimensional unless width is provided.
+    """
+    if isinstance(text, str):
+        text = text.encode()
+    # A minus sign may follow a digit, as in '3-4', so each is separated
+    # from what comes before it. Those not followed by a digit are not signs.
+    spaced = bytes(text).translate(_int_chars).replace(b'-', b' -')
+    chars = np.frombuffer(spaced, dtype=np.uint8)
+    if not chars.size or not np.any(chars > ord('-')):
+        values: np.ndarray = np.empty(0, dtype=np.int64)
+    else:
+        stray = chars == ord('-')
+        stray[:-1] &= chars[1:] == ord(' ')
+        if stray.any():
+            chars = chars.copy()
+            chars[stray] = ord(' ')
+            spaced = chars.tobytes()
+        values = np.fromstring(spaced, dtype=np.int64, sep=' ')
+    if width is not None:
+        if len(values) % width:
+            raise ValueError(
+                f'Cannot split {len(values)} integers into records of'
+                f' {width}')
+        values = values.reshape(-1, width)
+    return values
+
+
+def data_ints(
+        py_file_name: str, width: Optional[int] = None) -> np.ndarray:
+    """Extract all the integers from a puzzle solver's data file.
+
+    This should be invoked as ``data_ints(__file__)``. See `extract_ints` for
+    details.
+
+    :py_file_name: The name of the solver's python file.
+    :width:        If provided, the result is reshaped into records (rows) of
+                   this many integers.
+    """
+    with mapped_data(py_file_name) as buf:
+        return extract_ints(buf, width)
+
+
+def cached_parse(
+        py_file_name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorate a parsing function so that its result is cached on disk.
+
+    This should be used as ``@cached_parse(__file__)``. The result of the
+    decorated function is pickled into the cache directory and later calls
+    load the pickle instead of calling the function. Each call gets a freshly
+    loaded copy, so the caller may freely modify the result.
+
+    The cache key is built from the data file's path, size, modification time
+    and content, together with the solver's source code, the function's name
+    and its arguments. So an entry is never used if the data or solver have
+    changed.
+
+    The cache directory is '.aoc_cache', which can be overridden using the
+    AOC_CACHE environment variable. Setting AOC_CACHE to an empty string
+    disables caching. When the directory grows beyond PARSE_CACHE_MAX_BYTES,
+    the least recently used entries are removed.
+
+    :py_file_name: The name of the solver's python file.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            cache_dir = os.environ.get('AOC_CACHE', '.aoc_cache')
+            if not cache_dir:
+                return func(*args, **kwargs)
+
+            key = _parse_cache_key(py_file_name, func, args, kwargs)
+            stem = Path(py_file_name).stem
+            path = Path(cache_dir) / f'{stem}-{func.__name__}-{key}.pickle'
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, AttributeError, pickle.PickleError):
+                value = func(*args, **kwargs)
+                _store_cache_entry(path, value)
+            else:
+                os.utime(path)             # Keep track of recent use.
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def _parse_cache_key(py_file_name: str, func: Callable, args, kwargs) -> str:
+    """Calculate the key for a parse cache entry.
+
+    The key covers the source of this module, and of the other shared
+    modules, as well as the solver's, because parse results may be, or
+    contain, instances of classes defined there.
+    """
+    path = data_path(py_file_name).resolve()
+    h = hashlib.sha256()
+    h.update(f'{path}'.encode())
+    h.update(f'{func.__module__}.{func.__qualname__}'.encode())
+    h.update(f'{args!r}{kwargs!r}'.encode())
+    lib_dir = Path(__file__).parent
+    for file_path in (
+            path, Path(py_file_name),
+            *(lib_dir / name for name in SHARED_MODULES)):
+        h.update(_file_digest(file_path).encode())
+    return h.hexdigest()[:32]
+
+
+def _file_digest(path: Path) -> str:
+    """Calculate the SHA-256 digest of a file's content.
+
+    Digests are remembered for the life of the process, keyed on the file's
+    path, size and modification time, so each file is normally only read
+    once.
+    """
+    st = path.stat()
+    return _file_content_digest(
+        str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_content_digest(path: str, _size: int, _mtime_ns: int) -> str:
+    """Calculate a file's digest; the size and mtime only form the key."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(functools.partial(f.read, 1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def run_cached(
+        py_file_name: str, copy: bool = True
+    ) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorate a function so that its result is only calculated once per run.
+
+    This should be used as ``@run_cached(__file__)``. It lets a solver's parts
+    share parsed data and intermediate results; whichever part calls the
+    function first does the work and later calls, with the same arguments,
+    reuse the result. The results are held by the decorated function, so they
+    last until the solver's module is reloaded (run.py reloads a solver for
+    each run) or the process exits.
+
+    The first caller gets the result itself. A pickled snapshot is taken
+    before it is returned and later callers each get a fresh copy, unpickled
+    from the snapshot; so any caller may modify the result without affecting
+    the others. If the result is never modified, set copy to False to share
+    the one object and avoid the copying costs.
+
+    The cache key includes the data file's path, so solving several inputs in
+    one process (see `data_path`) does not mix up results.
+
+    :py_file_name: The name of the solver's python file.
+    :copy:         Set to False to share the result, rather than copies.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        results: Dict[Hashable, Any] = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            key = (
+                str(data_path(py_file_name)), args,
+                tuple(sorted(kwargs.items())))
+            try:
+                result = results[key]
+            except KeyError:
+                value = func(*args, **kwargs)
+                results[key] = (
+                    pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if copy
+                    else value)
+                return value
+            return pickle.loads(result) if copy else result
+
+        wrapper.cache_clear = results.clear              # type: ignore
+        return wrapper
+
+    return decorator
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for a `BoundedCache`."""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class BoundedCache:
+    """A dictionary like cache that holds a bounded number of entries.
+
+    When adding an entry would exceed maxsize, an existing entry is evicted.
+    The policy selects which one.
+
+    lru
+        The least recently used entry, where both lookups and stores count
+        as use.
+    fifo
+        The oldest entry. This makes lookups a little cheaper, because a hit
+        does not need to update the order of the entries.
+
+    Lookups, using `get`, count hits and misses; see `info`.
+
+    :maxsize: The maximum number of entries. ``None`` means unbounded.
+    :policy:  The eviction policy; 'lru' or 'fifo'.
+    """
+    def __init__(self, maxsize: Optional[int] = None, policy: str = 'lru'):
+        if policy not in ('lru', 'fifo'):
+            raise ValueError(f'Unknown cache eviction policy {policy!r}')
+        self.maxsize = maxsize
+        self.lru = policy == 'lru'
+        self.data: OrderedDict = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Look up an entry, returning default if there is no such entry."""
+        data = self.data
+        if key in data:
+            self.hits += 1
+            if self.lru:
+                data.move_to_end(key)
+            return data[key]
+        self.misses += 1
+        return default
+
+    def __setitem__(self, key: Hashable, value: Any):
+        data = self.data
+        data[key] = value
+        if self.lru:
+            data.move_to_end(key)
+        if self.maxsize is not None and len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def clear(self):
+        """Remove all the entries and reset the statistics."""
+        self.data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Provide the cache's statistics."""
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize,
+            len(self.data))
+
+
+# Memoize caches to be saved on exit, by file path.
+_persistent_memos: Dict[Path, List[BoundedCache]] = {}
+_missing = object()
+
+
+def memoize(
+        maxsize: Optional[int] = None, policy: str = 'lru',
+        persist: bool = False
+    ) -> Callable[[Callable[..., T]], 'Memoized[T]']:
+    """Decorate a function so that its results are cached in memory.
+
+    This is like ``functools.lru_cache``, but uses a `BoundedCache`, so
+    offers a choice of eviction policy and keeps eviction statistics. The
+    decorated function's arguments must be positional and hashable. The
+    wrapper, a `Memoized` instance, provides ``cache_info`` and
+    ``cache_clear`` methods.
+
+    If persist is set, the cache is saved to the parse cache directory (see
+    `cached_parse`) when the process exits and reloaded when the function is
+    next decorated. A saved cache is only used if the source file of the
+    function is unchanged. Persistence is quietly skipped for a function
+    without a source file.
+
+    :maxsize: The maximum number of cached results. ``None`` means
+              unbounded.
+    :policy:  The eviction policy; 'lru' or 'fifo'.
+    :persist: Set to save the cache between runs.
+    """
+    def decorator(func: Callable[..., T]) -> Memoized[T]:
+        cache = BoundedCache(maxsize, policy)
+        if persist:
+            _load_memo(cache, func)
+        return Memoized(func, cache)
+
+    return decorator
+
+
+class Memoized(Generic[T]):
+    """A function wrapped so that its results are cached; see `memoize`.
+
+    :func:  The wrapped function.
+    :cache: The cache of results, keyed by the arguments.
+    """
+    def __init__(self, func: Callable[..., T], cache: BoundedCache):
+        self.func = func
+        self.cache = cache
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args) -> T:
+        value = self.cache.get(args, _missing)
+        if value is _missing:
+            value = self.func(*args)
+            self.cache[args] = value
+        return value
+
+    def __reduce__(self):
+        # Pickle by name, like a plain function, rather than with the cache.
+        return self.__qualname__
+
+    def cache_info(self) -> CacheInfo:
+        """Provide the cache's statistics."""
+        return self.cache.info()
+
+    def cache_clear(self):
+        """Remove all the cached results."""
+        self.cache.clear()
+
+
+def _load_memo(cache: BoundedCache, func: Callable):
+    """Load a memoize cache from disk, if it was previously saved."""
+    cache_dir = os.environ.get('AOC_CACHE', '.aoc_cache')
+    if not cache_dir:
+        return
+
+    try:
+        source_file = inspect.getsourcefile(func)
+    except TypeError:
+        source_file = None
+    if source_file is None:
+        return
+
+    source = Path(source_file)
+    key = hashlib.sha256(source.read_bytes()).hexdigest()[:32]
+    path = Path(cache_dir) / f'{source.stem}-{func.__qualname__}-{key}.pickle'
+    try:
+        with open(path, 'rb') as f:
+            entries = pickle.load(f)
+    except (OSError, EOFError, AttributeError, pickle.PickleError):
+        pass
+    else:
+        for args, value in entries:
+            cache[args] = value
+    if not _persistent_memos:
+        atexit.register(_save_memos)
+    # Reloading a module decorates its functions again, so there may be
+    # several caches for a function.
+    _persistent_memos.setdefault(path, []).append(cache)
+
+
+def _save_memos():
+    """Save all the persistent memoize caches."""
+    for path, caches in _persistent_memos.items():
+        entries: Dict[Any, Any] = {}
+        for cache in caches:
+            entries.update(cache.data)
+        _store_cache_entry(path, list(entries.items()))
+
+
+def _store_cache_entry(path: Path, value):
+    """Store a parse cache entry and then evict old entries if necessary."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    entries = []
+    for entry in path.parent.glob('*.pickle'):
+        try:
+            entries.append((entry.stat(), entry))
+        except FileNotFoundError:
+            pass                           # Another process removed it.
+    total = sum(st.st_size for st, _ in entries)
+    for st, entry in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+        if total <= PARSE_CACHE_MAX_BYTES or entry == path:
+            break
+        entry.unlink(missing_ok=True)
+        total -= st.st_size
+
+
+class Grid:
+    """A 2D grid of small integers, backed by a contiguous NumPy array.
+
+    The grid can have a border of padding cells, which provides sentinel
+    values around the edges. This means that every inner cell has a full set
+    of neighbours, so neighbour operations can work on whole array views
+    without special handling of the edges.
+
+    :cells: The grid's cell values, which are copied.
+    :pad:   The width of the padding border.
+    :fill:  The value of the padding cells.
+    """
+    def __init__(self, cells: np.ndarray, pad: int = 0, fill: int = 0):
+        self.pad = pad
+        self.array = np.pad(cells, pad, constant_values=fill)
+
+    @classmethod
+    def from_lines(
+            cls,
+            lines: Iterable[str],
+            lkup: Optional[Mapping[str, int]] = None,
+            dtype=np.uint8,
+            **kwargs) -> 'Grid':
+        """Create a grid from lines of characters, one character per cell.
+
+        :lines:  The lines of text, which must all be the same length.
+        :lkup:   A mapping from character to cell value. If not provided, the
+                 characters must be the digits '0' to '9'.
+        :dtype:  The type for the cell values.
+        :kwargs: Passed on to the constructor; for example ``pad``.
+        """
+        rows = list(lines)
+        codes = np.frombuffer(''.join(rows).encode(), dtype=np.uint8)
+        codes = codes.reshape(len(rows), -1)
+        if lkup is None:
+            cells = (codes - ord('0')).astype(dtype)
+        else:
+            table = np.zeros(256, dtype=dtype)
+            for c, v in lkup.items():
+                table[ord(c)] = v
+            cells = table[codes]
+        return cls(cells, **kwargs)
+
+    @classmethod
+    def from_data(cls, py_file_name: str, **kwargs) -> 'Grid':
+        """Create a grid from a puzzle solver's data file.
+
+        This should be invoked as ``Grid.from_data(__file__)``. The keyword
+        arguments are passed on to `from_lines`.
+        """
+        return cls.from_lines(data_lines(py_file_name), **kwargs)
+
+    @property
+    def inner(self) -> np.ndarray:
+        """A view of the grid's cells, excluding the padding."""
+        p = self.pad
+        if p == 0:
+            return self.array
+        return self.array[p:-p, p:-p]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """The shape of the grid, excluding the padding."""
+        rows, cols = self.array.shape
+        return rows - 2 * self.pad, cols - 2 * self.pad
+
+    def shifted(self, offsets: Sequence[Offset]) -> List[np.ndarray]:
+        """Views of the grid shifted by each of a sequence of offsets.
+
+        Each view has the same shape as `inner`. Element [r, c] of the view for
+        offset (dr, dc) is the cell at [r + dr, c + dc] relative to the inner
+        cells, so the views provide the neighbours of every inner cell. The
+        padding must be at least as wide as the largest offset.
+
+        :offsets: A sequence of (row, column) offsets; for example `offsets4`
+                  or `offsets8`.
+        """
+        p = self.pad
+        rows, cols = self.shape
+        return [
+            self.array[p + dr: p + dr + rows, p + dc: p + dc + cols]
+            for dr, dc in offsets]
+
+    def neighbours(self, connectivity: int = 4) -> List[np.ndarray]:
+        """Views of every inner cell's 4 or 8 connected neighbours."""
+        return self.shifted(offsets4 if connectivity == 4 else offsets8)
+
+
+# Bytes and arrays are also iterable, hence the ignored overlap.
+@overload
+def windowize(                           # type: ignore[overload-overlap]
+        seq: Union[np.ndarray, bytes, bytearray], n: int) -> np.ndarray:
+    ...
+
+
+@overload
 def windowize(seq: Sequence[T], n: int) -> Iterator[Tuple[T, ...]]:
+    ...
+
+
+def windowize(seq, n):
     """Turn a sequence into overlapping windows of n items.
 
     For example, given n = 3 and a, b, c, d, e, f, ... The sequence (a, b, c),
     (b, c, d), (c, d, e), ... is produced.
+
+    When seq is a NumPy array, bytes or bytearray, the windows are returned
+    as a read-only, strided view; an array with an extra trailing axis of
+    length n. No data is copied. So, for example, ``windowize(a, 3).sum(1)``
+    gives the sum of each window. Bytes are viewed as an array of uint8.
+
+    For other sequences, an iterator of tuples is returned. The sequence is
+    iterated once for each position in a window, so it must not be a
+    one-shot iterator.
+
+    A sequence shorter than n has no windows, so the result is empty.
     """
-    iterators = [iter(seq) for _ in range(n)]
-    for i, it in enumerate(iterators):
-        for _ in range(i):
-            next(it)
-    return zip(*iterators)
+    if isinstance(seq, (bytes, bytearray)):
+        seq = np.frombuffer(seq, dtype=np.uint8)
+    if isinstance(seq, np.ndarray):
+        if len(seq) < n:
+            return np.empty((0, *seq.shape[1:], n), dtype=seq.dtype)
+        return np.lib.stride_tricks.sliding_window_view(seq, n, axis=0)
+    return zip(*(islice(seq, i, None) for i in range(n)))
 
 
 def watch_counter(n:int):
@@ -57,3 +817,219 @@ def range_intersection(ra: range, rb: range) -> range:
         is the range that fits between ra and rb.
     """
     return range(max(ra.start, rb.start), min(ra.stop, rb.stop))
+
+
+class BitVector:
+    """A fixed length sequence of bits, packed into a Python int.
+
+    Bit 0 is the leftmost, most significant, bit; so a vector reads like the
+    binary string it was made from and ``int(vector)`` is that string's
+    value. Operations work on the whole int at once, rather than bit by bit.
+
+    The bitwise operators (``|``, ``&`` and ``^``) align vectors of
+    different lengths at their right hand (least significant) ends, as for
+    ints, and the result has the longer length. Shifts keep the length,
+    discarding the bits shifted off the end.
+
+    Reading fields, with `read` or by indexing, uses a byte string copy of
+    the bits, made on the first read. So each read only converts the few
+    bytes that hold the field, rather than shifting the whole int.
+
+    :value:  The bits, as an int. Any bits beyond the length are discarded.
+    :length: The number of bits.
+    """
+    def __init__(self, value: int = 0, length: int = 0):
+        if length < 0:
+            raise ValueError(f'Bad bit vector length {length}')
+        self.length = length
+        self.value = value & ((1 << length) - 1)
+        self._bytes: Optional[bytes] = None
+
+    @classmethod
+    def from_string(cls, bits: str) -> 'BitVector':
+        """Create a bit vector from a string of '0' and '1' characters."""
+        return cls(int(bits, 2) if bits else 0, len(bits))
+
+    @classmethod
+    def from_hex(cls, digits: str) -> 'BitVector':
+        """Create a bit vector from hexadecimal digits; 4 bits per digit."""
+        return cls(int(digits, 16) if digits else 0, 4 * len(digits))
+
+    def read(self, pos: int, width: int) -> int:
+        """Read a fixed width field as an int.
+
+        :pos:   The index of the field's first (most significant) bit.
+        :width: The number of bits in the field.
+        """
+        if pos < 0 or width < 0 or pos + width > self.length:
+            raise IndexError(
+                f'Cannot read {width} bits at {pos} from {self.length}')
+        if self._bytes is None:
+            # Pad the bits out to whole bytes, on the right, so bit i is in
+            # byte i // 8.
+            pad = -self.length % 8
+            self._bytes = (self.value << pad).to_bytes(
+                (self.length + pad) // 8, 'big')
+        end = pos + width
+        first, last = pos >> 3, (end + 7) >> 3
+        chunk = int.from_bytes(self._bytes[first:last], 'big')
+        return (chunk >> (last * 8 - end)) & ((1 << width) - 1)
+
+    def popcount(self) -> int:
+        """The number of set bits."""
+        return self.value.bit_count()
+
+    def reversed(self) -> 'BitVector':
+        """A copy of this vector with the bits in reverse order."""
+        return BitVector.from_string(str(self)[::-1])
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                raise ValueError('Bit vector slices must have a step of 1')
+            width = max(0, stop - start)
+            return BitVector(self.read(start, width), width)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('Bit vector index out of range')
+        return self.read(index, 1)
+
+    def __or__(self, other: 'BitVector') -> 'BitVector':
+        return BitVector(
+            self.value | other.value, max(self.length, other.length))
+
+    def __and__(self, other: 'BitVector') -> 'BitVector':
+        return BitVector(
+            self.value & other.value, max(self.length, other.length))
+
+    def __xor__(self, other: 'BitVector') -> 'BitVector':
+        return BitVector(
+            self.value ^ other.value, max(self.length, other.length))
+
+    def __invert__(self) -> 'BitVector':
+        return BitVector(~self.value, self.length)
+
+    def __lshift__(self, count: int) -> 'BitVector':
+        return BitVector(self.value << count, self.length)
+
+    def __rshift__(self, count: int) -> 'BitVector':
+        return BitVector(self.value >> count, self.length)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __int__(self) -> int:
+        return self.value
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(c) for c in str(self))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitVector):
+            return NotImplemented
+        return self.value == other.value and self.length == other.length
+
+    def __hash__(self) -> int:
+        return hash((self.value, self.length))
+
+    def __str__(self):
+        return f'{self.value:0{self.length}b}' if self.length else ''
+
+    def __repr__(self):
+        return f"BitVector('{self}')"
+
+
+def _ignore(*_args, **_kwargs):
+    """Do nothing; stands in for `Instruments.count` when disabled."""
+
+
+_null_timer = nullcontext()
+
+
+class Instruments:
+    """Named counters and timers for instrumenting solvers' hot paths.
+
+    Use the shared `instruments` instance, as in::
+
+        instruments.count('cache hits')
+        with instruments.timer('search'):
+            ...
+
+    Instrumentation is disabled by default, in which case ``count`` is a
+    function that does nothing and ``timer`` returns a shared null context,
+    so the cost is just a method call. Run.py enables instrumentation when
+    asked to collect stats. For a stand alone solver script, set the
+    AOC_STATS environment variable to the name of a file; instrumentation is
+    enabled and the results are written to the file, as JSON, when the
+    process exits.
+    """
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, List[float]] = {}
+        self.enabled = False
+        self.count: Callable[..., None] = _ignore
+        self.timer: Callable[[str], ContextManager] = self._null_timer
+
+    def enable(self):
+        """Start recording counts and timings."""
+        self.enabled = True
+        self.count = self._count
+        self.timer = self._timer
+
+    def disable(self):
+        """Stop recording; anything already recorded is kept."""
+        self.enabled = False
+        self.count = _ignore
+        self.timer = self._null_timer
+
+    def reset(self):
+        """Discard everything recorded so far."""
+        self.counters.clear()
+        self.timings.clear()
+
+    def results(self) -> Dict[str, Dict]:
+        """Provide the recorded counts and timings.
+
+        :return:
+            A dictionary with 'counters', mapping each counter name to its
+            value and 'timers', mapping each timer name to a dictionary of
+            'calls' and 'total' (seconds).
+        """
+        return {
+            'counters': dict(self.counters),
+            'timers': {
+                name: {'calls': calls, 'total': total}
+                for name, (calls, total) in self.timings.items()},
+        }
+
+    def _count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    @contextmanager
+    def _timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += 1
+            timing[1] += time.perf_counter() - start
+
+    @staticmethod
+    def _null_timer(_name: str) -> ContextManager:
+        return _null_timer
+
+
+def _write_stats(path: str):
+    """Write the collected instrument results to a file."""
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump(instruments.results(), f, indent=4, sort_keys=True)
+        f.write('\n')
+
+
+instruments = Instruments()
+if os.environ.get('AOC_STATS'):
+    instruments.enable()
+    atexit.register(_write_stats, os.environ['AOC_STATS'])
@@ -0,0 +1,154 @@
+"""Helpers for sharing a solver's work between processes."""
+
+import multiprocessing
+import os
+from functools import partial
+from multiprocessing import shared_memory
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar)
+
+import numpy as np                               # pylint: disable=import-error
+
+T = TypeVar('T')
+U = TypeVar('U')
+
+# With fewer items than this, parallel_map runs serially; starting worker
+# processes costs more than it saves.
+PARALLEL_MIN_ITEMS = 1000
+
+# The number of chunks parallel_map makes for each worker process, so that
+# uneven chunks still keep every worker busy.
+CHUNKS_PER_JOB = 4
+
+
+def parallel_map(
+        func: Callable[[T], U], items: Iterable[T],
+        reducer: Optional[Callable[[Iterable], Any]] = None, *,
+        jobs: Optional[int] = None,
+        min_items: int = PARALLEL_MIN_ITEMS) -> Any:
+    """Apply a function to every item, sharing the work between processes.
+
+    The items are split into chunks, which are handed out to a pool of
+    worker processes. So the function (and reducer) must be picklable; a
+    module level function or a ``functools.partial`` of one.
+
+    If reducer is provided, it is applied to the results for each chunk and
+    then to the per-chunk reductions. So it must be something like ``sum``,
+    ``min`` or ``max``; a function of an iterable for which reducing partial
+    reductions gives the same answer. Otherwise a list of the results, in
+    the same order as the items, is returned.
+
+    The items are split into about CHUNKS_PER_JOB chunks per job. The work is
+    done serially, in this process, if there are fewer than min_items items
+    or only one job. If waiting for the results is interrupted by an
+    exception, the workers are stopped and the exception is raised at once.
+
+    :func:      The function to apply to each item.
+    :items:     The items.
+    :reducer:   An optional function to combine the results.
+    :jobs:      The number of worker processes. By default, this is taken
+                from the AOC_JOBS environment variable or, if that is not
+                set, the number of CPUs.
+    :min_items: The minimum number of items for which to use workers.
+    """
+    items = list(items)
+    if jobs is None:
+        jobs = int(os.environ.get('AOC_JOBS', 0)) or os.cpu_count() or 1
+    if jobs <= 1 or len(items) < min_items:
+        return _map_chunk(func, reducer, items)
+
+    chunk_size = -(-len(items) // (jobs * CHUNKS_PER_JOB))
+    chunks = [
+        items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    # Leaving the block terminates the workers, so an exception, such as
+    # run.py's time limit, does not wait for the outstanding chunks.
+    with multiprocessing.Pool(jobs) as pool:
+        partials = pool.map(
+            partial(_map_chunk, func, reducer), chunks, chunksize=1)
+    if reducer is not None:
+        return reducer(partials)
+    return [result for chunk_results in partials for result in chunk_results]
+
+
+def _map_chunk(
+        func: Callable[[T], U], reducer: Optional[Callable[[Iterable], Any]],
+        chunk: List[T]) -> Any:
+    """Apply a function to a chunk of items, for `parallel_map`."""
+    results = [func(item) for item in chunk]
+    return results if reducer is None else reducer(results)
+
+
+class SharedArray:
+    """A NumPy array in shared memory, for handing to worker processes.
+
+    Pickling a SharedArray only sends the shared memory block's name and the
+    array's shape and dtype, so a worker (see `parallel_map`) attaches to the
+    same memory rather than receiving a copy of the data. Workers can also
+    write to the array, for example to fill in their own rows of a result,
+    and the parent sees the changes.
+
+    The process that creates a SharedArray owns the shared memory and must
+    free it using `close`, or by using the SharedArray as a context manager.
+    Attachments in workers are closed when they are garbage collected. Copy
+    anything that is still needed out of the array before closing it.
+
+    :shape: The array's shape.
+    :dtype: The array's element type.
+    """
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = int(np.prod(self.shape)) * self.dtype.itemsize
+        # A zero sized block is not allowed.
+        self.shm: Optional[shared_memory.SharedMemory] = (
+            shared_memory.SharedMemory(create=True, size=max(size, 1)))
+        self.name = self.shm.name
+        self.owner = True
+        self._array: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'SharedArray':
+        """Create a SharedArray holding a copy of an array."""
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @property
+    def array(self) -> np.ndarray:
+        """The array, backed by the shared memory."""
+        if self._array is None:
+            if self.shm is None:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+            self._array = np.ndarray(
+                self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        return self._array
+
+    def close(self):
+        """Detach from the shared memory; the owner also frees it."""
+        self._array = None
+        if self.shm is None:
+            return
+        if self.owner:
+            self.shm.unlink()
+        try:
+            self.shm.close()
+        except BufferError:
+            # Views of the array still exist. The memory is unmapped when
+            # they have gone.
+            pass
+        self.shm = None
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __getstate__(self) -> Dict:
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype}
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.shm = None
+        self.owner = False
+        self._array = None
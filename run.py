@@ -4,9 +4,37 @@ This will run puzzle scripts and verify that the solution is correct.
 """
 
 import argparse
+import ast
+import cProfile
+import hashlib
+import importlib
+import io
+import json
+import linecache
+import multiprocessing
 import os
+import pstats
+import resource
+import signal
+import statistics
 import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Tuple)
+
+import lib
 
 solutions = {
     'day1': ('1709', '1761'),
@@ -35,43 +63,944 @@ solutions = {
 }
 
 
-def run_solvers(args):
-    """Run the solvers."""
+@dataclass
+class Result:                 # pylint: disable=too-many-instance-attributes
+    """The outcome of running a single solver.
+
+    :name:    The solver's name; for example 'day3'.
+    :answers: The answers, normally for part 1 and part 2, or ``None`` if
+              the solver's output could not be parsed.
+    :output:  Any (unexpected) output from the solver.
+    :errors:  Any error output from the solver.
+    :timeout: The time limit (in seconds) if the solver was stopped for
+              running too long, otherwise ``None``.
+    :elapsed: The wall time, in seconds, taken to run the solver.
+    :cached:  True if this result was taken from the result cache rather
+              than by running the solver.
+    :stats:   The solver's instrument results (see `lib.Instruments`), if
+              they were collected.
+    """
+    name: str
+    answers: Optional[Tuple[str, ...]] = None
+    output: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    elapsed: Optional[float] = None
+    cached: bool = False
+    stats: Optional[Dict] = None
+
+
+class SolverTimeout(Exception):
+    """Raised when an in-process solver exceeds its time limit."""
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Limit the run time of the code within the context.
+
+    A `SolverTimeout` is raised if the time limit is exceeded. This uses
+    SIGALRM, so only works in a process's main thread.
+
+    :seconds: The time limit. A value of ``None`` means no limit.
+    """
+    def on_alarm(_signum, _frame):
+        raise SolverTimeout
+
+    if seconds is None:
+        yield
+        return
+
+    prev_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, prev_handler)
+
+
+def lines(output: str) -> List[str]:
+    """Split solver output into a list of right stripped lines."""
+    return [line.rstrip() for line in output.splitlines()]
+
+
+def run_script(
+        py_file: Path, timeout: Optional[float] = None,
+        stats: bool = False) -> Result:
+    """Run a solver script in a separate Python process.
+
+    :py_file: The solver script.
+    :timeout: If not ``None``, the solver process is killed if it takes longer
+              than this number of seconds.
+    :stats:   If set, the solver's instruments are enabled and the results
+              collected.
+    """
+    env = None
+    if stats:
+        stats_file = tempfile.NamedTemporaryFile(
+            prefix=f'{py_file.stem}-', suffix='.json', delete=False)
+        stats_file.close()
+        env = dict(os.environ, AOC_STATS=stats_file.name)
+    stats_text = ''
+    start = time.perf_counter()
+    try:
+        res = subprocess.run(
+            ['python', str(py_file)], check=False, capture_output=True,
+            timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return Result(py_file.stem, timeout=timeout)
+    finally:
+        if stats:
+            stats_path = Path(stats_file.name)
+            stats_text = stats_path.read_text(encoding='utf8')
+            stats_path.unlink()
+    result = Result(
+        py_file.stem, output=lines(res.stdout.decode()),
+        errors=lines(res.stderr.decode()),
+        elapsed=time.perf_counter() - start)
+    if stats_text:
+        result.stats = json.loads(stats_text)
+    if len(result.output) == 2:
+        a, b = result.output
+        result.answers = a, b
+    return result
+
+
+def run_module(
+        py_file: Path, timeout: Optional[float] = None,
+        stats: bool = False,
+        parts: Tuple[str, ...] = ('part1', 'part2')) -> Result:
+    """Import a solver module and run its part functions in this process.
+
+    The solver module must provide ``part1`` and ``part2`` functions, each of
+    which returns the answer for that part of the puzzle. Anything the solver
+    prints is captured, so it can be reported if something goes wrong. The
+    module is freshly loaded, so no state is left over from any earlier run.
+
+    :py_file: The solver script.
+    :timeout: If not ``None``, the solver is abandoned if it takes longer
+              than this number of seconds.
+    :stats:   If set, the solver's instruments are enabled and the results
+              collected.
+    :parts:   The names of the part functions to run. The result's answers
+              are in the same order.
+    """
+    result = Result(py_file.stem)
+    stdout = io.StringIO()
+    if stats:
+        lib.instruments.reset()
+        lib.instruments.enable()
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(stdout), time_limit(timeout):
+            module = fresh_module(py_file.stem)
+            answers = tuple(str(getattr(module, part)()) for part in parts)
+    except SolverTimeout:
+        result.timeout = timeout
+    except Exception:                        # pylint: disable=broad-except
+        result.errors = lines(traceback.format_exc())
+    else:
+        result.answers = answers
+        result.elapsed = time.perf_counter() - start
+    finally:
+        if stats:
+            lib.instruments.disable()
+            result.stats = lib.instruments.results()
+    result.output = lines(stdout.getvalue())
+    return result
+
+
+def run_parts_apart(
+        py_file: Path, timeout: Optional[float] = None,
+        stats: bool = False) -> Result:
+    """Run a solver's two parts at the same time, in separate processes.
+
+    Each part is run, using `run_module`, in its own worker process and the
+    results are then combined. Neither part can see the other's module
+    state, so any work that the parts normally share, such as a cached
+    parse or search, is done twice. That can cost more than running the
+    parts apart saves; day 19, for example, took over three times as long.
+    So a solver that sets PARTS_SHARE_WORK (see `parts_share_work`) has both
+    parts run in a single worker process instead.
+
+    :py_file: The solver script.
+    :timeout: If not ``None``, a part is abandoned if it takes longer than
+              this number of seconds.
+    :stats:   If set, the solver's instruments are enabled and the results
+              for both parts collected.
+    """
+    start = time.perf_counter()
+    run = partial(run_module, py_file, timeout, stats)
+    if parts_share_work(py_file):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            return pool.submit(run).result()
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        halves = list(pool.map(run, [('part1',), ('part2',)]))
+
+    result = Result(py_file.stem)
+    answers: List[str] = []
+    for half in halves:
+        result.output.extend(half.output)
+        result.errors.extend(half.errors)
+        if half.timeout is not None:
+            result.timeout = half.timeout
+        if half.answers is not None:
+            answers.extend(half.answers)
+    if len(answers) == len(halves):
+        result.answers = tuple(answers)
+        result.elapsed = time.perf_counter() - start
+    if stats:
+        result.stats = merge_stats(
+            [half.stats for half in halves if half.stats is not None])
+    return result
+
+
+def parts_share_work(py_file: Path) -> bool:
+    """Test whether a solver's parts share expensive work.
+
+    A solver declares this by setting PARTS_SHARE_WORK to ``True``. The
+    solver module is imported to check, but no part is run.
+    """
+    module = importlib.import_module(py_file.stem)
+    return bool(getattr(module, 'PARTS_SHARE_WORK', False))
+
+
+def merge_stats(all_stats: List[Dict]) -> Dict:
+    """Combine instrument results (see `lib.Instruments.results`)."""
+    counters: Counter = Counter()
+    timers: Dict[str, Dict] = {}
+    for stats in all_stats:
+        counters.update(stats['counters'])
+        for name, timing in stats['timers'].items():
+            merged = timers.setdefault(name, {'calls': 0, 'total': 0.0})
+            merged['calls'] += timing['calls']
+            merged['total'] += timing['total']
+    return {'counters': dict(counters), 'timers': timers}
+
+
+def report(result: Result):
+    """Report the result of running a solver."""
+    expected = solutions.get(result.name, (None, None))
+    pref = f'{result.name}.py: '
+    if result.timeout is not None:
+        print(f'{pref}TIMEOUT after {result.timeout}s')
+    elif result.answers is None:
+        print(f'{pref}Malformed')
+        print('\n'.join(f'    {line}' for line in result.output))
+        print('\n'.join(f'    !! {line}' for line in result.errors))
+    elif result.answers == expected:
+        a, b = result.answers
+        note = ''
+        if result.cached:
+            note = f' (cached, {result.elapsed:.2f}s)'
+        print(f'{pref}Ok   {a}, {b}{note}')
+    else:
+        print(f'{pref}FAIL {result.answers} != expected {expected}')
+    if result.stats:
+        report_stats(result.stats)
+
+
+def report_stats(stats: Dict):
+    """Report a solver's instrument results."""
+    for name, value in sorted(stats['counters'].items()):
+        print(f'    {name:<32} {value:>12}')
+    for name, timing in sorted(stats['timers'].items()):
+        print(
+            f'    {name:<32} {timing["calls"]:>12} calls'
+            f' {timing["total"]:10.4f}s')
+
+
+def fresh_module(name: str):
+    """Import a solver module, reloading it if it has already been imported.
+
+    Reloading discards any state (caches, mutated globals, etc.) left over
+    from a previous run of the solver.
+    """
+    if name in sys.modules:
+        return importlib.reload(sys.modules[name])
+    return importlib.import_module(name)
+
+
+def disable_disk_caches():
+    """Stop solvers using the on-disk parse and memo caches.
+
+    Benchmarks and profiles should measure the parsing, not the loading of
+    cached results (see `lib.cached_parse`). Worker processes started later
+    inherit the setting.
+    """
+    os.environ['AOC_CACHE'] = ''
+
+
+def time_part(name: str, part: str, warmup: int, repeat: int) -> List[float]:
+    """Time repeated runs of one part of a solver.
+
+    The solver module is freshly loaded for every run, so each timing includes
+    all the work the part needs to do.
+
+    :name:   The solver's name; for example 'day3'.
+    :part:   The part function's name; 'part1' or 'part2'.
+    :warmup: The number of untimed runs to perform first.
+    :repeat: The number of timed runs.
+    :return: The wall time, in seconds, for each timed run.
+    """
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeat):
+            func = getattr(fresh_module(name), part)
+            start = time.perf_counter()
+            func()
+            if i >= warmup:
+                times.append(time.perf_counter() - start)
+    return times
+
+
+def timing_stats(times: List[float]) -> Dict[str, float]:
+    """Calculate summary statistics for a set of timings."""
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'repeat': len(times),
+    }
+
+
+def bench_solvers(args):
+    """Benchmark the solvers, comparing against any stored baseline.
+
+    The baseline file holds the timing statistics for each part of each
+    solver. A part is flagged as a regression if its median time exceeds the
+    baseline median by more than the threshold fraction. New results are
+    added to the baseline for solvers that do not yet have an entry; existing
+    entries are only replaced when requested.
+    """
+    disable_disk_caches()
+    baseline_path = Path(args.baseline)
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding='utf8'))
+    except FileNotFoundError:
+        baseline = {}
+
+    for py_file in select_solvers(args):
+        name = py_file.stem
+        pref = f'{name}.py: '
+        stats = {}
+        for part in ('part1', 'part2'):
+            try:
+                times = time_part(name, part, args.warmup, args.repeat)
+            except Exception as exc:         # pylint: disable=broad-except
+                print(f'{pref}{part} failed: {exc!r}')
+                break
+            stats[part] = st = timing_stats(times)
+            flag = ''
+            old_st = baseline.get(name, {}).get(part)
+            if old_st and st['median'] > old_st['median'] * (
+                    1 + args.threshold):
+                change = st['median'] / old_st['median'] - 1
+                flag = f' REGRESSED {change:+.0%}'
+            print(
+                f'{pref}{part} min={st["min"]:.4f}s'
+                f' median={st["median"]:.4f}s'
+                f' stddev={st["stddev"]:.4f}s{flag}')
+        else:
+            if args.save_baseline or name not in baseline:
+                baseline[name] = stats
+
+    baseline_path.write_text(
+        json.dumps(baseline, indent=4, sort_keys=True) + '\n',
+        encoding='utf8')
+
+
+class StackSampler:
+    """A context manager that periodically samples the Python call stack.
+
+    Samples are taken using SIGPROF, so this only works in a process's main
+    thread. Only the frames below the one that entered the context are
+    recorded.
+
+    :interval: The sampling interval in seconds of CPU time.
+    """
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.base_frame = None
+        self.prev_handler = None
+
+    def _sample(self, _signum, frame):
+        stack = []
+        while frame is not None and frame is not self.base_frame:
+            code = frame.f_code
+            name = Path(code.co_filename).name
+            stack.append(f'{code.co_name} ({name}:{code.co_firstlineno})')
+            frame = frame.f_back
+        if stack:
+            self.counts[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.base_frame = sys._getframe(1)   # pylint: disable=protected-access
+        self.prev_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.prev_handler)
+        self.base_frame = None
+
+    def write_collapsed(self, path: Path):
+        """Write the samples in the collapsed stack format.
+
+        This is the format used by flamegraph.pl, speedscope, inferno, etc.
+        Each line is a semicolon separated stack followed by a sample count.
+        """
+        with open(path, 'w', encoding='utf8') as f:
+            for stack, n in sorted(self.counts.items()):
+                f.write(f'{stack} {n}\n')
+
+
+def profile_solvers(args):
+    """Profile the solvers, reporting the hottest functions.
+
+    Each solver is run under cProfile and a stack sampler. For each solver a
+    table of the hottest functions (by internal time) is printed and the
+    following files are written to the profile directory:
+
+    <name>.prof
+        The raw cProfile statistics, for use with pstats, snakeviz, etc.
+    <name>.collapsed
+        The sampled stacks, for flamegraph tools.
+    """
+    disable_disk_caches()
+    out_dir = Path(args.profile_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for py_file in select_solvers(args):
+        name = py_file.stem
+        profiler = cProfile.Profile()
+        try:
+            with redirect_stdout(io.StringIO()):
+                module = fresh_module(name)
+                with StackSampler() as sampler:
+                    profiler.enable()
+                    try:
+                        module.part1()
+                        module.part2()
+                    finally:
+                        profiler.disable()
+        except Exception as exc:             # pylint: disable=broad-except
+            print(f'{name}.py: failed: {exc!r}')
+            continue
+
+        profiler.dump_stats(out_dir / f'{name}.prof')
+        sampler.write_collapsed(out_dir / f'{name}.collapsed')
+        print(f'{name}.py: hot functions')
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(args.top)
+
+
+class PeakSnapshotter:
+    """A context manager that snapshots traced memory close to its peak.
+
+    While active, tracemalloc's traced memory is checked periodically (using
+    SIGPROF) and a new snapshot is taken whenever it has grown by more than
+    the margin since the previous snapshot. A final check is made on exit.
+    This means that the snapshot shows the allocations that were alive at or
+    near the point of peak memory use, rather than just those that survive
+    to the end.
+
+    :interval: The checking interval in seconds of CPU time.
+    :margin:   The fractional growth that triggers a new snapshot.
+    """
+    def __init__(self, interval: float = 0.01, margin: float = 0.1):
+        self.interval = interval
+        self.margin = margin
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self.busy = False
+        self.prev_handler = None
+
+    def _check(self, *_args):
+        # Taking a snapshot can be slow, so guard against the signal arriving
+        # while we are still busy with the previous one.
+        if self.busy:
+            return
+        self.busy = True
+        try:
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self.snapshot_size * (1 + self.margin):
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_size = current
+        finally:
+            self.busy = False
+
+    def __enter__(self):
+        self.prev_handler = signal.signal(signal.SIGPROF, self._check)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.prev_handler)
+        self._check()
+
+
+def format_size(n: float) -> str:
+    """Format a number of bytes in a human friendly way."""
+    for units in ('B', 'KiB', 'MiB'):
+        if abs(n) < 1024:
+            return f'{n:.1f} {units}'
+        n /= 1024
+    return f'{n:.1f} GiB'
+
+
+def memory_profile_part(name: str, part: str, top: int) -> Dict:
+    """Run one part of a solver, recording memory use.
+
+    This is intended to be run in a fresh process, so that the peak RSS
+    figure applies to just this part.
+
+    :return:
+        A dictionary with the peak traced memory ('peak'), the process's peak
+        RSS ('rss') and a list of the top allocation sites ('sites'). Each
+        site is a tuple of (filename, lineno, size, count) and reflects the
+        allocations alive close to the point of peak traced memory.
+    """
+    with redirect_stdout(io.StringIO()):
+        func = getattr(fresh_module(name), part)
+        tracemalloc.start()
+        try:
+            with PeakSnapshotter() as snapshotter:
+                func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    sites = []
+    if snapshotter.snapshot is not None:
+        snapshot = snapshotter.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        for stat in snapshot.statistics('lineno')[:top]:
+            frame = stat.traceback[0]
+            sites.append((frame.filename, frame.lineno, stat.size, stat.count))
+
+    # On Linux ru_maxrss is in KiB.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {'peak': peak, 'rss': rss, 'sites': sites}
 
-    def lines(output):
-        return [line.rstrip() for line in output.decode().splitlines()]
 
+def memory_profile_solvers(args):
+    """Profile the memory use of the solvers.
+
+    Each part of each solver is run in a fresh process under tracemalloc. The
+    peak traced memory, peak RSS and top allocation sites are reported.
+    """
+    disable_disk_caches()
+    for py_file in select_solvers(args):
+        name = py_file.stem
+        pref = f'{name}.py: '
+        for part in ('part1', 'part2'):
+            try:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    res = pool.submit(
+                        memory_profile_part, name, part, args.top).result()
+            except Exception as exc:         # pylint: disable=broad-except
+                print(f'{pref}{part} failed: {exc!r}')
+                break
+            print(
+                f'{pref}{part} peak traced={format_size(res["peak"])}'
+                f' peak RSS={format_size(res["rss"])}')
+            for filename, lineno, size, count in res['sites']:
+                code = linecache.getline(filename, lineno).strip()
+                print(
+                    f'    {format_size(size):>10} {count:>9} blocks'
+                    f'  {Path(filename).name}:{lineno}  {code}')
+
+
+def measure_part(
+        name: str, part: str, timeout: Optional[float],
+        stats: bool = False) -> Dict:
+    """Run one part of a solver, measuring its resource use.
+
+    This is intended to be run in a fresh process, so that the CPU time and
+    peak RSS figures apply to just this part. The timings include importing
+    the solver module.
+
+    :return:
+        A dictionary with the answer ('answer'), wall time ('wall'), CPU time
+        ('cpu') and the process's peak RSS ('rss'). Times are in seconds and
+        sizes in bytes. If stats is set, the solver's instrument results are
+        included ('stats').
+    """
+    if stats:
+        lib.instruments.enable()
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()), time_limit(timeout):
+        answer = getattr(importlib.import_module(name), part)()
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (after.ru_utime + after.ru_stime) - (
+        before.ru_utime + before.ru_stime)
+
+    # On Linux ru_maxrss is in KiB.
+    measurements = {
+        'answer': str(answer), 'wall': wall, 'cpu': cpu,
+        'rss': after.ru_maxrss * 1024}
+    if stats:
+        measurements['stats'] = lib.instruments.results()
+    return measurements
+
+
+def telemetry_solvers(args):
+    """Run the solvers, writing a JSON record for each part to stdout.
+
+    Each part of each solver is run in a fresh process. One JSON object is
+    written per line, with the fields:
+
+    solver, part
+        For example 'day3' and 'part1'.
+    status
+        'ok' if the part returned an answer, 'error' if it raised an
+        exception, 'timeout' if it was abandoned or 'crashed' if its process
+        died.
+    answer, expected, passed
+        The answer (or null), the expected answer (or null) and whether they
+        match.
+    wall, cpu, rss
+        The wall time and CPU time in seconds, and the peak RSS in bytes; or
+        null if the part did not complete.
+    error
+        A description of the failure, or null.
+    timestamp
+        When the part was started, in seconds since the epoch.
+    stats
+        Only when stats are requested; the instrument results (see
+        `lib.Instruments.results`), or null if the part did not complete.
+    """
+    for py_file in select_solvers(args):
+        name = py_file.stem
+        for i, part in enumerate(('part1', 'part2')):
+            record = {
+                'solver': name, 'part': part, 'status': 'ok',
+                'answer': None, 'wall': None, 'cpu': None, 'rss': None,
+                'error': None, 'timestamp': time.time()}
+            if args.stats:
+                record['stats'] = None
+            try:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    record.update(pool.submit(
+                        measure_part, name, part, args.timeout,
+                        args.stats).result())
+            except SolverTimeout:
+                record['status'] = 'timeout'
+                record['error'] = f'exceeded {args.timeout}s'
+            except BrokenProcessPool as exc:
+                record['status'] = 'crashed'
+                record['error'] = repr(exc)
+            except Exception as exc:         # pylint: disable=broad-except
+                record['status'] = 'error'
+                record['error'] = repr(exc)
+            expected = solutions.get(name, (None, None))[i]
+            record['expected'] = expected
+            record['passed'] = (
+                expected is not None and record['answer'] == expected)
+            print(json.dumps(record, sort_keys=True), flush=True)
+
+
+def run_input(
+        py_file: Path, input_file: Path,
+        timeout: Optional[float] = None) -> Result:
+    """Run a solver against a given input file, in this process.
+
+    :py_file:    The solver script.
+    :input_file: The input file, used in place of the solver's data file.
+    :timeout:    If not ``None``, the solver is abandoned if it takes longer
+                 than this number of seconds.
+    """
+    os.environ['AOC_INPUT'] = str(input_file)
+    try:
+        return run_module(py_file, timeout)
+    finally:
+        del os.environ['AOC_INPUT']
+
+
+def input_answers(input_file: Path) -> Optional[Tuple[str, ...]]:
+    """Read the expected answers for an input file, if it has any.
+
+    The answers are read from a file alongside the input file, with the
+    suffix '.answers'. It holds one line per part. For a compressed input
+    file, such as 'input.txt.gz', the answers file is 'input.answers'.
+    """
+    if input_file.suffix in lib.decompressors:
+        input_file = input_file.with_suffix('')
+    try:
+        text = input_file.with_suffix('.answers').read_text(encoding='utf8')
+    except FileNotFoundError:
+        return None
+    return tuple(lines(text))
+
+
+def run_batch(args):
+    """Run one solver against every input file in a directory.
+
+    The input files are the '.txt' files, plus any compressed '.txt' files
+    (see `lib.decompressors`).
+
+    The input files are shared out between a pool of worker processes. The
+    answers and time taken are reported for each input file. Where an input
+    file has an '.answers' file (see `input_answers`), the answers are
+    checked. A summary is printed at the end.
+    """
+    py_file = select_solvers(args)[0]
+    suffixes = ('.txt',) + tuple(f'.txt{ext}' for ext in lib.decompressors)
+    input_files = sorted(
+        path for path in Path(args.inputs).iterdir()
+        if path.name.endswith(suffixes))
+    run = partial(run_input, py_file, timeout=args.timeout)
+    outcomes: Counter = Counter()
+    times: List[float] = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for input_file, result in zip(input_files, pool.map(run, input_files)):
+            outcomes[report_input_result(input_file, result)] += 1
+            if result.elapsed is not None and result.answers is not None:
+                times.append(result.elapsed)
+
+    summary = ', '.join(f'{n} {outcome}' for outcome, n in outcomes.items())
+    print(f'{py_file}: {len(input_files)} inputs; {summary}')
+    if times:
+        print(
+            f'{py_file}: total={sum(times):.3f}s'
+            f' median={statistics.median(times):.3f}s max={max(times):.3f}s')
+
+
+def report_input_result(input_file: Path, result: Result) -> str:
+    """Report the result of running a solver against an input file.
+
+    :return:
+        The outcome; one of 'timeout', 'error', 'unchecked', 'ok' or 'fail'.
+    """
+    pref = f'{input_file}: '
+    if result.timeout is not None:
+        print(f'{pref}TIMEOUT after {result.timeout}s')
+        return 'timeout'
+    if result.answers is None:
+        print(f'{pref}Error')
+        print('\n'.join(f'    !! {line}' for line in result.errors))
+        return 'error'
+
+    a, b = result.answers
+    expected = input_answers(input_file)
+    if expected is None:
+        outcome, status = 'unchecked', '     '
+    elif result.answers == expected:
+        outcome, status = 'ok', 'Ok   '
+    else:
+        outcome, status = 'fail', f'FAIL expected {expected}, got '
+    print(f'{pref}{status}{a}, {b} ({result.elapsed:.3f}s)')
+    return outcome
+
+
+def select_solvers(args) -> List[Path]:
+    """Select the solver scripts to run, in day order."""
     if args.devel:
         os.environ['AOC_DEVEL'] = 'dev_data'
+    if args.jobs > 1:
+        # The solvers are already running in parallel, so stop them from
+        # starting their own workers (see parallel.parallel_map).
+        os.environ['AOC_JOBS'] = '1'
 
+    solvers: Iterable[Path]
     if args.solver:
-        solvers = [args.solver]
+        solvers = [args.solver.with_suffix('.py')]
     else:
         solvers = Path('.').glob('day*.py')
-    for py_file in sorted(solvers, key=lambda p: int(p.stem[3:])):
-        expected = solutions.get(py_file.stem, (None, None))
-        # print(f'Running: {py_file}, expecting {expected}')
-        res= subprocess.run(
-            ['python', str(py_file)], check=False, capture_output=True)
-        output = lines(res.stdout)
-        output_parsed = False
-        if len(output) == 2:
-            try:
-                a, b = lines(res.stdout)
-            except ValueError:
-                pass
+    return sorted(solvers, key=lambda p: int(p.stem[3:]))
+
+
+def fork_server_pool(jobs: int) -> ProcessPoolExecutor:
+    """Create a pool that runs each solver in its own, freshly forked process.
+
+    The processes are forked from a server process that has already imported
+    lib and numpy, so each solver starts without paying for interpreter
+    start up or those imports. Each process runs just one solver, so
+    solvers remain as isolated from each other as when run as scripts.
+
+    :jobs: The maximum number of solvers to run at once.
+    """
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['lib', 'numpy'])
+    return ProcessPoolExecutor(
+        max_workers=jobs, mp_context=context, max_tasks_per_child=1)
+
+
+def solver_digest(py_file: Path) -> str:
+    """Hash everything that a solver's result depends on.
+
+    This covers the solver's source, the source of every local module that it
+    imports (see `local_modules`) and the solver's data file. A missing file
+    is hashed as such, so creating it changes the digest.
+    """
+    h = hashlib.sha256()
+    for path in (*local_modules(py_file), lib.data_path(py_file.name)):
+        h.update(f'{path}\0'.encode())
+        try:
+            h.update(path.read_bytes())
+        except FileNotFoundError:
+            h.update(b'\0missing')
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def local_modules(py_file: Path) -> List[Path]:
+    """Find a script and the local modules that it imports, directly or not.
+
+    A local module is a ``.py`` file in the script's directory. The imports
+    are found by parsing the source, so no module is actually imported.
+    """
+    found: List[Path] = []
+    pending = [py_file]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        try:
+            tree = ast.parse(path.read_bytes(), str(path))
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                names = [node.module or '']
             else:
-                output_parsed = True
-                pref = f'{str(py_file):0}: '
-                if (a, b) == expected:
-                    print(f'{pref}Ok   {a}, {b}')
-                else:
-                    print(f'{pref}FAIL {(a, b)} != expected {expected}')
+                continue
+            for name in names:
+                module = py_file.parent / f'{name.split(".")[0]}.py'
+                if module.exists():
+                    pending.append(module)
+    return found
+
 
-        if not output_parsed:
-            print(f'{py_file}: Malformed')
-            print('\n'.join(f'    {line}' for line in lines(res.stdout)))
-            print('\n'.join(f'    !! {line}' for line in lines(res.stderr)))
+def load_result_cache(path: Path) -> Dict[str, Dict]:
+    """Load the result cache; an unreadable cache is treated as empty."""
+    try:
+        return json.loads(path.read_text(encoding='utf8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_result(entry: Optional[Dict], name: str, digest: str
+        ) -> Optional[Result]:
+    """Convert a result cache entry to a `Result`, if it is still valid.
+
+    An entry is valid if the digest matches and the cached answers are still
+    the expected ones.
+    """
+    if entry is None or entry.get('digest') != digest:
+        return None
+    if tuple(entry['answers']) != solutions.get(name):
+        return None
+    return Result(
+        name, answers=tuple(entry['answers']), output=entry['output'],
+        errors=entry['errors'], elapsed=entry['elapsed'], cached=True)
+
+
+def reusable_results(
+        args, cache: Dict[str, Dict], digests: Dict[str, str]
+    ) -> Dict[str, Result]:
+    """Find the solvers whose cached results can be used instead of running.
+
+    No cached results are used if a rerun is forced or stats are being
+    collected.
+    """
+    reused = {}
+    if not (args.force or args.stats):
+        for name, digest in digests.items():
+            result = cached_result(cache.get(name), name, digest)
+            if result is not None:
+                reused[name] = result
+    return reused
+
+
+def update_result_cache(
+        cache: Dict[str, Dict], digest: str, result: Result) -> None:
+    """Record a solver's result in the cache, if the answers are verified.
+
+    Any previous entry for an unverified result is removed.
+    """
+    name = result.name
+    if result.answers == solutions.get(name, (None, None)):
+        cache[name] = {
+            'digest': digest,
+            'answers': result.answers,
+            'output': result.output,
+            'errors': result.errors,
+            'elapsed': result.elapsed,
+        }
+    else:
+        cache.pop(name, None)
+
+
+def start_solvers(
+        args, stack: ExitStack, py_files: List[Path]) -> Iterator[Result]:
+    """Start running solvers, as selected by the command line arguments.
+
+    :stack:    Any worker pool is entered into this.
+    :py_files: The solver scripts to run.
+    :return:   The results, in the same order as py_files.
+    """
+    if args.parts_apart:
+        runner = run_parts_apart
+    elif args.in_process or args.fork_server:
+        runner = run_module
+    else:
+        runner = run_script
+    run = partial(runner, timeout=args.timeout, stats=args.stats)
+    pool: Executor
+    if args.fork_server:
+        pool = stack.enter_context(fork_server_pool(args.jobs))
+        return pool.map(run, py_files)
+    if args.jobs > 1:
+        # Script mode and the parts apart mode already run each solver in
+        # other processes, so threads are enough to drive them.
+        executor: Callable[..., Executor]
+        if args.in_process and not args.parts_apart:
+            executor = ProcessPoolExecutor
+        else:
+            executor = ThreadPoolExecutor
+        pool = stack.enter_context(executor(max_workers=args.jobs))
+        return pool.map(run, py_files)
+    return map(run, py_files)
+
+
+def run_solvers(args):
+    """Run the solvers.
+
+    Verified results are recorded in the result cache, along with a digest of
+    the solver's source, lib.py and data file. A solver is only run again if
+    one of these has changed, or a rerun is forced. Collecting stats also
+    forces every solver to run.
+    """
+    py_files = select_solvers(args)
+    cache_path = Path(args.result_cache)
+    cache = load_result_cache(cache_path)
+    digests = {py_file.stem: solver_digest(py_file) for py_file in py_files}
+    reused = reusable_results(args, cache, digests)
+    to_run = [py_file for py_file in py_files if py_file.stem not in reused]
+
+    with ExitStack() as stack:
+        results = start_solvers(args, stack, to_run)
+        for py_file in py_files:
+            result = reused.get(py_file.stem) or next(results)
+            report(result)
+            if not result.cached:
+                update_result_cache(cache, digests[py_file.stem], result)
+
+    cache_path.write_text(
+        json.dumps(cache, indent=4, sort_keys=True) + '\n', encoding='utf8')
 
 
 if __name__ == '__main__':
@@ -80,5 +1009,91 @@ if __name__ == '__main__':
         'solver', type=Path, nargs='?', help='The name os a solver script')
     parser.add_argument(
         '-d', '--devel', action='store_true', help='Use development data')
+    parser.add_argument(
+        '-i', '--in-process', action='store_true',
+        help='Run the solvers within this process, instead of one Python'
+             ' process per solver')
+    parser.add_argument(
+        '-F', '--fork-server', action='store_true',
+        help='Run each solver in a process forked from a server that has'
+             ' already imported lib and numpy')
+    parser.add_argument(
+        '-P', '--parts-apart', action='store_true',
+        help="Run each solver's two parts at the same time, in separate"
+             ' worker processes; solvers whose parts share work (see'
+             ' PARTS_SHARE_WORK) still run both parts in one process')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        help='Run up to N solvers in parallel')
+    parser.add_argument(
+        '-t', '--timeout', type=float, metavar='SECONDS',
+        help='Abandon any solver that runs for longer than this')
+    parser.add_argument(
+        '-b', '--bench', action='store_true',
+        help='Benchmark the solvers instead of just checking the answers')
+    parser.add_argument(
+        '--warmup', type=int, default=1, metavar='N',
+        help='Benchmark: the number of untimed runs (default: 1)')
+    parser.add_argument(
+        '--repeat', type=int, default=5, metavar='N',
+        help='Benchmark: the number of timed runs (default: 5)')
+    parser.add_argument(
+        '--baseline', default='bench_baseline.json', metavar='FILE',
+        help='Benchmark: the baseline results file'
+             ' (default: bench_baseline.json)')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1, metavar='FRACTION',
+        help='Benchmark: flag a part whose median time exceeds the baseline'
+             ' by more than this fraction (default: 0.1)')
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Benchmark: replace existing baseline entries with the new'
+             ' results')
+    parser.add_argument(
+        '-p', '--profile', action='store_true',
+        help='Profile the solvers, reporting the hottest functions')
+    parser.add_argument(
+        '--top', type=int, default=25, metavar='N',
+        help='Profile/memory: the number of functions or allocation sites'
+             ' to report (default: 25)')
+    parser.add_argument(
+        '--profile-dir', default='.', metavar='DIR',
+        help='Profile: where to write the .prof and .collapsed files'
+             ' (default: current directory)')
+    parser.add_argument(
+        '-m', '--memory', action='store_true',
+        help='Profile the memory use of the solvers')
+    parser.add_argument(
+        '--json', action='store_true',
+        help='Write a JSON record, with answer, timings and peak RSS, for'
+             ' each part of each solver')
+    parser.add_argument(
+        '-s', '--stats', action='store_true',
+        help="Collect and report the solvers' instrument counters and"
+             ' timers')
+    parser.add_argument(
+        '--inputs', metavar='DIR',
+        help='Run the solver against every input file (*.txt, *.txt.gz,'
+             ' etc.) in DIR, using up to --jobs worker processes')
+    parser.add_argument(
+        '-f', '--force', action='store_true',
+        help='Run every selected solver, ignoring any cached results')
+    parser.add_argument(
+        '--result-cache', default='.aoc_results.json', metavar='FILE',
+        help='Where verified results are cached between runs'
+             ' (default: .aoc_results.json)')
     cmd_args = parser.parse_args()
-    run_solvers(cmd_args)
+    if cmd_args.inputs and not cmd_args.solver:
+        parser.error('--inputs requires a solver')
+    if cmd_args.inputs:
+        run_batch(cmd_args)
+    elif cmd_args.bench:
+        bench_solvers(cmd_args)
+    elif cmd_args.profile:
+        profile_solvers(cmd_args)
+    elif cmd_args.memory:
+        memory_profile_solvers(cmd_args)
+    elif cmd_args.json:
+        telemetry_solvers(cmd_args)
+    else:
+        run_solvers(cmd_args)
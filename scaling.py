@@ -0,0 +1,541 @@
+"""Synthetic input generators and a solver scaling harness.
+
+Each generator produces a valid puzzle input of (approximately) a requested
+size. The harness runs a solver against generated inputs of growing size and
+fits the empirical complexity exponent; that is the value k for which the run
+time grows in proportion to size ** k.
+
+The meaning of 'size' depends on the puzzle, but is always roughly the amount
+of input; for example the number of lines or grid cells.
+"""
+
+import argparse
+import io
+import math
+import os
+import random
+import string
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import day19
+from run import SolverTimeout, time_limit, time_part
+
+Generator = Callable[[int, random.Random], List[str]]
+
+# The segments for each seven segment display digit; see day8.py.
+segment_codes = (
+    'abcefg', 'cf', 'acdeg', 'acdfg', 'bcdf',
+    'abdfg', 'abdefg', 'acf', 'abcdefg', 'abcdfg')
+
+
+def grid_side(n: int) -> int:
+    """The side length of a square grid with about n cells."""
+    return max(3, math.isqrt(n))
+
+
+def gen_day1(n: int, rng: random.Random) -> List[str]:
+    """Generate n sonar depth readings."""
+    depth = 100
+    lines = []
+    for _ in range(n):
+        depth = max(0, depth + rng.randint(-20, 30))
+        lines.append(str(depth))
+    return lines
+
+
+def gen_day2(n: int, rng: random.Random) -> List[str]:
+    """Generate n submarine commands."""
+    commands = ('forward', 'down', 'up')
+    return [f'{rng.choice(commands)} {rng.randint(1, 9)}' for _ in range(n)]
+
+
+def gen_day3(n: int, rng: random.Random) -> List[str]:
+    """Generate at least n diagnostic binary numbers.
+
+    The life support search fails if, at some bit position, all the remaining
+    values have the same bit. Using every value of a given bit width
+    (shuffled) avoids this, so n is rounded up to a power of 2.
+    """
+    width = max(1, (n - 1).bit_length())
+    values = list(range(2 ** width))
+    rng.shuffle(values)
+    return [f'{v:0{width}b}' for v in values]
+
+
+def gen_day4(n: int, rng: random.Random) -> List[str]:
+    """Generate the drawn numbers and n bingo cards."""
+    values = list(range(100))
+    rng.shuffle(values)
+    lines = [','.join(str(v) for v in values)]
+    for _ in range(n):
+        card = rng.sample(range(100), 25)
+        lines.append('')
+        for i in range(0, 25, 5):
+            lines.append(' '.join(f'{v:2}' for v in card[i:i + 5]))
+    return lines
+
+
+def gen_day5(n: int, rng: random.Random) -> List[str]:
+    """Generate n horizontal, vertical or diagonal vent lines."""
+    lines = []
+    for _ in range(n):
+        x1, y1 = rng.randrange(1000), rng.randrange(1000)
+        length = rng.randint(1, 200)
+        dx, dy = rng.choice(
+            ((1, 0), (-1, 0), (0, 1), (0, -1),
+             (1, 1), (1, -1), (-1, 1), (-1, -1)))
+        x2 = min(999, max(0, x1 + dx * length))
+        y2 = min(999, max(0, y1 + dy * length))
+        if dx and dy:
+            # Keep diagonals at exactly 45 degrees after clipping.
+            length = min(abs(x2 - x1), abs(y2 - y1))
+            x2, y2 = x1 + dx * length, y1 + dy * length
+        lines.append(f'{x1},{y1} -> {x2},{y2}')
+    return lines
+
+
+def gen_day6(n: int, rng: random.Random) -> List[str]:
+    """Generate n lantern fish timers."""
+    return [','.join(str(rng.randint(1, 5)) for _ in range(n))]
+
+
+def gen_day7(n: int, rng: random.Random) -> List[str]:
+    """Generate n crab submarine positions."""
+    return [','.join(str(rng.randrange(2000)) for _ in range(n))]
+
+
+def gen_day8(n: int, rng: random.Random) -> List[str]:
+    """Generate n scrambled seven segment display entries."""
+    lines = []
+    for _ in range(n):
+        wires = list('abcdefg')
+        rng.shuffle(wires)
+        mapping = dict(zip('abcdefg', wires))
+        codes = [
+            ''.join(rng.sample([mapping[c] for c in code], len(code)))
+            for code in segment_codes]
+        preamble = rng.sample(codes, 10)
+        digits = [rng.choice(codes) for _ in range(4)]
+        lines.append(f'{" ".join(preamble)} | {" ".join(digits)}')
+    return lines
+
+
+def gen_day9(n: int, rng: random.Random) -> List[str]:
+    """Generate a heightmap of about n cells."""
+    side = grid_side(n)
+    return [
+        ''.join(str(rng.randrange(10)) for _ in range(side))
+        for _ in range(side)]
+
+
+def gen_day10(n: int, rng: random.Random) -> List[str]:
+    """Generate n lines of navigation code.
+
+    About half the lines are corrupted and the rest are incomplete.
+    """
+    pairs = (('(', ')'), ('[', ']'), ('{', '}'), ('<', '>'))
+    lines = []
+    for _ in range(n):
+        stack: List[str] = []
+        chars = []
+        for _ in range(rng.randint(20, 100)):
+            if stack and rng.random() < 0.45:
+                chars.append(stack.pop())
+            else:
+                opener, closer = rng.choice(pairs)
+                chars.append(opener)
+                stack.append(closer)
+        if rng.random() < 0.5:
+            # Corrupt the line with an unexpected closer.
+            chars.append(rng.choice([
+                c for _, c in pairs if not stack or c != stack[-1]]))
+        elif not stack:
+            chars.append('(')
+        lines.append(''.join(chars))
+    return lines
+
+
+def gen_day12(n: int, rng: random.Random) -> List[str]:
+    """Generate a cave network with about n caves.
+
+    A chain of small caves runs from start to end and each small cave has its
+    own big cave hanging off it. Big caves are never linked to each other,
+    otherwise there would be an infinite number of routes.
+    """
+    names = set()
+
+    def name(big: bool) -> str:
+        while True:
+            letters = rng.choices(string.ascii_lowercase, k=4)
+            s = ''.join(letters)
+            s = s.upper() if big else s
+            if s not in names and s not in ('start', 'end'):
+                names.add(s)
+                return s
+
+    lines = []
+    prev = 'start'
+    for _ in range(max(1, n // 2)):
+        small = name(big=False)
+        lines.append(f'{prev}-{small}')
+        lines.append(f'{small}-{name(big=True)}')
+        prev = small
+    lines.append(f'{prev}-end')
+    return lines
+
+
+def gen_day13(n: int, rng: random.Random) -> List[str]:
+    """Generate n dots and the folds that reduce them to a small code page.
+
+    Dots are placed on a 40 by 6 page, which is then repeatedly unfolded
+    (with each dot randomly mirrored) until the dots cover about a quarter of
+    the paper. This means every fold exactly halves the paper and no dot lies
+    on a fold line.
+    """
+    width, height = 40, 6
+    x_folds: List[int] = []
+    y_folds: List[int] = []
+    while width * height < 4 * n:
+        if width <= height * 4:
+            x_folds.append(width)
+            width = width * 2 + 1
+        else:
+            y_folds.append(height)
+            height = height * 2 + 1
+
+    dots = {(width - 1, height - 1)}
+    while len(dots) < n:
+        x, y = rng.randrange(40), rng.randrange(6)
+        for fold in x_folds:
+            if rng.random() < 0.5:
+                x = 2 * fold - x
+        for fold in y_folds:
+            if rng.random() < 0.5:
+                y = 2 * fold - y
+        dots.add((x, y))
+
+    folds = [f'fold along x={x}' for x in reversed(x_folds)]
+    folds += [f'fold along y={y}' for y in reversed(y_folds)]
+    return [f'{x},{y}' for x, y in dots] + [''] + folds
+
+
+def gen_day14(n: int, rng: random.Random) -> List[str]:
+    """Generate a polymer template of n elements and a full rule set."""
+    elements = 'BCFHKNOPSV'
+    lines = [''.join(rng.choices(elements, k=max(2, n))), '']
+    for a in elements:
+        for b in elements:
+            lines.append(f'{a}{b} -> {rng.choice(elements)}')
+    return lines
+
+
+def gen_day15(n: int, rng: random.Random) -> List[str]:
+    """Generate a square risk grid of about n cells."""
+    side = grid_side(n)
+    return [
+        ''.join(str(rng.randint(1, 9)) for _ in range(side))
+        for _ in range(side)]
+
+
+def encode_packet(rng: random.Random, count: int) -> str:
+    """Encode a random packet tree of about count packets as a bit string."""
+    version = f'{rng.randrange(8):03b}'
+    if count <= 1:
+        value = rng.randrange(1 << rng.randint(4, 16))
+        nibbles = f'{value:b}'.zfill(-(-value.bit_length() // 4) * 4 or 4)
+        groups = [nibbles[i:i + 4] for i in range(0, len(nibbles), 4)]
+        body = ''.join(
+            ('1' if i < len(groups) - 1 else '0') + g
+            for i, g in enumerate(groups))
+        return f'{version}100{body}'
+
+    count -= 1
+    if count >= 2 and rng.random() < 0.2:
+        typ = rng.randint(5, 7)
+        half = count // 2
+        sub_packets = [
+            encode_packet(rng, half), encode_packet(rng, count - half)]
+    else:
+        typ = rng.choice((0, 1, 2, 3))
+        k = min(count, rng.randint(1, 8))
+        sizes = [count // k] * k
+        sizes[0] += count - sum(sizes)
+        sub_packets = [encode_packet(rng, size) for size in sizes]
+
+    bits = ''.join(sub_packets)
+    if len(bits) < 1 << 15 and rng.random() < 0.5:
+        header = f'0{len(bits):015b}'
+    else:
+        header = f'1{len(sub_packets):011b}'
+    return f'{version}{typ:03b}{header}{bits}'
+
+
+def gen_day16(n: int, rng: random.Random) -> List[str]:
+    """Generate a transmission containing about n packets."""
+    bits = encode_packet(rng, n)
+    bits += '0' * (-len(bits) % 4)
+    return [
+        ''.join(f'{int(bits[i:i + 4], 2):X}' for i in range(0, len(bits), 4))]
+
+
+def gen_day17(n: int, rng: random.Random) -> List[str]:
+    """Generate a target area at a distance of about n."""
+    xa = max(10, n)
+    xb = xa + rng.randint(xa // 4, xa // 2)
+    ya = -max(10, n)
+    yb = ya + rng.randint(-ya // 4, -ya // 2)
+    return [f'target area: x={xa}..{xb}, y={ya}..{yb}']
+
+
+def snailfish_number(rng: random.Random, depth: int = 1) -> str:
+    """Generate a random, reduced snailfish number."""
+    parts = []
+    for _ in range(2):
+        if depth < 4 and rng.random() < 0.6:
+            parts.append(snailfish_number(rng, depth + 1))
+        else:
+            parts.append(str(rng.randrange(10)))
+    return f'[{parts[0]},{parts[1]}]'
+
+
+def gen_day18(n: int, rng: random.Random) -> List[str]:
+    """Generate n snailfish numbers."""
+    return [snailfish_number(rng) for _ in range(max(2, n))]
+
+
+def gen_day19(n: int, rng: random.Random) -> List[str]:
+    """Generate reports from a chain of n scanners.
+
+    The scanners are placed 1000 apart along the X axis, so each scanner's
+    range (1000 in each direction) overlaps with its neighbours' but no
+    others. Twelve beacons are placed in each overlap, plus a few more close
+    to each scanner. Each scanner reports the beacons within its range in a
+    random orientation.
+    """
+    n = max(2, n)
+    beacons = set()
+    for i in range(n):
+        x0 = i * 1000
+        for _ in range(12 if i < n - 1 else 0):
+            beacons.add((
+                x0 + rng.randint(1, 999),
+                rng.randint(-999, 999), rng.randint(-999, 999)))
+        for _ in range(rng.randint(3, 10)):
+            beacons.add((
+                x0 + rng.randint(-999, 999) // 3,
+                rng.randint(-999, 999), rng.randint(-999, 999)))
+
+    lines = []
+    for i in range(n):
+        x0 = i * 1000
+        ops = rng.choice(day19.reorientations) if i else ()
+        lines.append(f'--- scanner {i} ---')
+        for x, y, z in sorted(beacons):
+            if abs(x - x0) < 1000:
+                coord = x - x0, y, z
+                for op in ops:
+                    coord = op(coord)
+                lines.append(','.join(str(v) for v in coord))
+        lines.append('')
+    return lines
+
+
+def gen_day20(n: int, rng: random.Random) -> List[str]:
+    """Generate an enhancement program and an image of about n pixels.
+
+    The program maps an all dark neighbourhood to a lit pixel and an all lit
+    neighbourhood to dark, so the infinite background flashes.
+    """
+    program = ['#'] + [rng.choice('#.') for _ in range(510)] + ['.']
+    side = grid_side(n)
+    lines = [''.join(program), '']
+    for _ in range(side):
+        lines.append(''.join(rng.choice('#.') for _ in range(side)))
+    return lines
+
+
+def gen_day22(n: int, rng: random.Random) -> List[str]:
+    """Generate n reboot steps.
+
+    As in the real puzzle, the first 20 steps lie within the initialisation
+    region and the rest are much larger.
+    """
+    lines = []
+    for i in range(n):
+        state = 'on' if i < 10 or rng.random() < 0.6 else 'off'
+        if i < 20:
+            lo, hi, size = -50, 50, 50
+        else:
+            lo, hi, size = -100_000, 100_000, 50_000
+        ranges = []
+        for axis in 'xyz':
+            a = rng.randint(lo, hi - 1)
+            b = min(hi, a + rng.randint(1, size))
+            ranges.append(f'{axis}={a}..{b}')
+        lines.append(f'{state} {",".join(ranges)}')
+    return lines
+
+
+def gen_day25(n: int, rng: random.Random) -> List[str]:
+    """Generate a sea cucumber grid of about n cells.
+
+    A random grid may never settle; a lone east facing sea cucumber in an
+    otherwise empty row, for example, circles forever. So the last column is
+    a wall of south facing sea cucumbers and the last row a wall of east
+    facing ones. The walls can never move and no other sea cucumber can get
+    past them, so each can only move a limited distance and the herds are
+    sure to stop.
+    """
+    side = grid_side(n)
+    lines = [
+        ''.join(rng.choice('>v...') for _ in range(side - 1)) + 'v'
+        for _ in range(side - 1)]
+    lines.append('>' * side)
+    return lines
+
+
+# The generator, the expected complexity exponent and a suitable starting size
+# for each solver. Not all solvers are present:
+#
+# day11 - a random grid of octopi may never flash simultaneously.
+# day21 - the input is just two starting positions.
+# day23 - the burrow has a fixed size.
+# day24 - the input is built into the solver.
+#
+# An expected exponent of 1.2 is used for n.log(n) behaviour.
+generators: Dict[str, Tuple[Generator, float, int]] = {
+    'day1': (gen_day1, 1.0, 100_000),
+    'day2': (gen_day2, 1.0, 100_000),
+    'day3': (gen_day3, 1.2, 16_384),
+    'day4': (gen_day4, 1.0, 1_000),
+    'day5': (gen_day5, 1.0, 10_000),
+    'day6': (gen_day6, 1.0, 100_000),
+    'day7': (gen_day7, 1.0, 10_000),
+    'day8': (gen_day8, 1.0, 10_000),
+    'day9': (gen_day9, 1.0, 100_000),
+    'day10': (gen_day10, 1.0, 10_000),
+    'day12': (gen_day12, 3.0, 100),
+    'day13': (gen_day13, 1.0, 10_000),
+    'day14': (gen_day14, 1.0, 100_000),
+    'day15': (gen_day15, 1.5, 1_000),
+    'day16': (gen_day16, 1.0, 10_000),
+    'day17': (gen_day17, 3.0, 50),
+    'day18': (gen_day18, 2.0, 20),
+    'day19': (gen_day19, 3.0, 3),
+    'day20': (gen_day20, 1.0, 10_000),
+    'day22': (gen_day22, 2.0, 50),
+    'day25': (gen_day25, 1.5, 20_000),
+}
+
+
+def write_input(name: str, size: int, data_dir: Path, seed: int) -> Path:
+    """Generate an input file for a solver.
+
+    :return: The directory containing the generated file.
+    """
+    gen, _, _ = generators[name]
+    size_dir = data_dir / str(size)
+    size_dir.mkdir(parents=True, exist_ok=True)
+    lines = gen(size, random.Random(f'{seed}:{name}:{size}'))
+    (size_dir / f'{name}.txt').write_text(
+        '\n'.join(lines) + '\n', encoding='utf8')
+    return size_dir
+
+
+def time_solver(name: str, data_dir: Path, timeout: float) -> Optional[float]:
+    """Time both parts of a solver using the data in a given directory.
+
+    :return: The total wall time in seconds or ``None`` if the time limit was
+             exceeded.
+    """
+    os.environ['AOC_DEVEL'] = str(data_dir)
+    total = 0.0
+    try:
+        with time_limit(timeout):
+            for part in ('part1', 'part2'):
+                total += sum(time_part(name, part, warmup=0, repeat=1))
+    except SolverTimeout:
+        return None
+    return total
+
+
+def fit_exponent(points: List[Tuple[int, float]]) -> float:
+    """Fit the exponent k, for which time is proportional to size ** k.
+
+    This is a least squares fit of log(time) against log(size).
+    """
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(t) for _, t in points]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    den = sum((x - x_mean) ** 2 for x in xs)
+    return num / den
+
+
+def run_scaling(args):
+    """Run the scaling tests and report the results."""
+    # Caching parsed inputs would hide the parsing cost.
+    os.environ['AOC_CACHE'] = ''
+    names = args.solvers or sorted(generators, key=lambda s: int(s[3:]))
+    for name in names:
+        _, expected, start = generators[name]
+        points = []
+        size = args.start or start
+        for _ in range(args.steps):
+            size_dir = write_input(name, size, Path(args.data_dir), args.seed)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    t = time_solver(name, size_dir, args.timeout)
+            except Exception as exc:         # pylint: disable=broad-except
+                print(f'{name}: size={size} failed: {exc!r}')
+                break
+            if t is None:
+                print(f'{name}: size={size} TIMEOUT after {args.timeout}s')
+                break
+            print(f'{name}: size={size} time={t:.4f}s')
+            points.append((size, t))
+            size = int(size * args.factor)
+
+        if len(points) < 2:
+            print(f'{name}: not enough results to fit an exponent')
+            continue
+        k = fit_exponent(points)
+        flag = ''
+        if k > expected + args.tolerance:
+            flag = ' WORSE THAN EXPECTED'
+        print(f'{name}: exponent={k:.2f} expected={expected:.2f}{flag}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        'Measure how the solvers scale with input size')
+    parser.add_argument(
+        'solvers', nargs='*', metavar='SOLVER',
+        help='The solvers to test; for example day5 (default: all)')
+    parser.add_argument(
+        '--start', type=int, metavar='SIZE',
+        help='The initial input size (default: a per solver value)')
+    parser.add_argument(
+        '--factor', type=float, default=2.0,
+        help='The growth factor for each step (default: 2)')
+    parser.add_argument(
+        '--steps', type=int, default=5,
+        help='The number of sizes to try (default: 5)')
+    parser.add_argument(
+        '--timeout', type=float, default=60.0, metavar='SECONDS',
+        help='Stop growing once a solver takes longer than this'
+             ' (default: 60)')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Flag exponents that exceed the expected value by more than'
+             ' this (default: 0.25)')
+    parser.add_argument(
+        '--seed', type=int, default=2021,
+        help='The random seed for the generators (default: 2021)')
+    parser.add_argument(
+        '--data-dir', default='scale_data', metavar='DIR',
+        help='Where to write the generated inputs (default: scale_data)')
+    run_scaling(parser.parse_args())
@@ -0,0 +1,282 @@
+"""Sets of integers and integer points, held as intervals and boxes."""
+
+from itertools import product
+from typing import Callable, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np                               # pylint: disable=import-error
+
+Interval = Union[range, Tuple[int, int]]
+
+# A box, as a sequence of intervals, one per axis, or an array of the
+# (start, stop) bounds with shape (dims, 2).
+Box = Union[Sequence[Interval], np.ndarray]
+
+
+def _interval_bounds(interval: Interval) -> Tuple[int, int]:
+    """Get the (start, stop) of a step 1 range or (start, stop) pair."""
+    if isinstance(interval, range):
+        return interval.start, interval.stop
+    start, stop = interval
+    return start, stop
+
+
+class IntervalSet:
+    """A set of integers, held as sorted, merged, half open intervals.
+
+    The intervals are stored as the NumPy arrays `starts` and `stops`. They
+    never overlap or touch, so each set has exactly one representation.
+
+    The set operators (``|``, ``&``, ``-`` and ``^``) each make a single
+    sweep over the sorted interval end points of both sets, so they take
+    time proportional to the number of intervals, not the number of
+    integers. The length is the number of integers in the set.
+
+    :intervals: The initial intervals, as step 1 ranges or (start, stop)
+                pairs. They may be in any order and may overlap.
+    """
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        bounds = np.array(
+            [_interval_bounds(r) for r in intervals],
+            dtype=np.int64).reshape((-1, 2))
+        bounds = bounds[bounds[:, 0] < bounds[:, 1]]
+        self.starts, self.stops = self._sweep(
+            (bounds[:, 0],), (bounds[:, 1],), lambda depth: depth > 0)
+
+    @classmethod
+    def _from_arrays(
+            cls, starts: np.ndarray, stops: np.ndarray) -> 'IntervalSet':
+        """Create an interval set from already merged intervals."""
+        interval_set = cls()
+        interval_set.starts, interval_set.stops = starts, stops
+        return interval_set
+
+    @staticmethod
+    def _sweep(
+            starts: Sequence[np.ndarray], stops: Sequence[np.ndarray],
+            keep: Callable[[np.ndarray], np.ndarray]
+        ) -> Tuple[np.ndarray, np.ndarray]:
+        """Sweep over the end points of groups of intervals.
+
+        Each group's intervals are weighted by a different power of two.
+        Summing the weights of the intervals that cover each point gives a
+        depth that, for groups of disjoint intervals, identifies which groups
+        include the point.
+
+        :starts: The intervals' starts, for each group.
+        :stops:  The intervals' stops, for each group.
+        :keep:   Selects, from an array of depths, the points to keep.
+        :return: The starts and stops of the merged, kept intervals.
+        """
+        weights = [
+            np.full(len(group), 1 << i, dtype=np.int64)
+            for i, group in enumerate(starts)]
+        points = np.concatenate((*starts, *stops))
+        deltas = np.concatenate((*weights, *(-w for w in weights)))
+        order = np.argsort(points, kind='stable')
+        points = points[order]
+        depths = np.cumsum(deltas[order])
+
+        # Only the depth after the last change at each point matters.
+        last = np.ones(len(points), dtype=bool)
+        last[:-1] = points[1:] != points[:-1]
+        points = points[last]
+        inside = keep(depths[last])
+        before = np.append(False, inside[:-1])
+        return points[inside & ~before], points[before & ~inside]
+
+    def _combine(
+            self, other: 'IntervalSet',
+            keep: Callable[[np.ndarray], np.ndarray]) -> 'IntervalSet':
+        """Combine with another set; depth 1, 2 or 3 means self, other or
+        both."""
+        return self._from_arrays(*self._sweep(
+            (self.starts, other.starts), (self.stops, other.stops), keep))
+
+    def __or__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self._combine(other, lambda depth: depth > 0)
+
+    def __and__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self._combine(other, lambda depth: depth == 3)
+
+    def __sub__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self._combine(other, lambda depth: depth == 1)
+
+    def __xor__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self._combine(other, lambda depth: (depth == 1) | (depth == 2))
+
+    def __contains__(self, value: int) -> bool:
+        i = np.searchsorted(self.stops, value, side='right')
+        return bool(i < len(self.starts) and self.starts[i] <= value)
+
+    def __len__(self) -> int:
+        return int((self.stops - self.starts).sum())
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return (
+            np.array_equal(self.starts, other.starts)
+            and np.array_equal(self.stops, other.stops))
+
+    def ranges(self) -> List[range]:
+        """The intervals, in order, as ranges."""
+        return [
+            range(start, stop)
+            for start, stop in zip(self.starts.tolist(), self.stops.tolist())]
+
+    def __repr__(self):
+        return f'IntervalSet({self.ranges()})'
+
+
+class BoxSet:
+    """A set of integer points in n dimensions, held as disjoint boxes.
+
+    Each box is an axis aligned, half open block of points. The boxes are
+    stored as the NumPy array `boxes`, with shape (n, dims, 2), which holds
+    the (start, stop) for each axis of each box. The boxes never overlap,
+    but neither are they merged; so the same set may be held as different
+    boxes.
+
+    The set operators (``|``, ``&`` and ``-``) work box by box through the
+    right hand set, applying each box to all of the left hand set's boxes at
+    once. Removing a box splits every box that it overlaps into up to
+    2 * dims slabs that surround the overlap. The length is the number of
+    points in the set.
+
+    :dims:  The number of dimensions.
+    :boxes: The initial boxes, each as a sequence of step 1 ranges or
+            (start, stop) pairs, one per axis, or as an array of bounds. An
+            array with shape (n, dims, 2) may hold all the boxes. They may
+            overlap.
+    """
+    def __init__(self, dims: int, boxes: Iterable[Box] = ()):
+        self.dims = dims
+        self.boxes = np.empty((0, dims, 2), dtype=np.int64)
+        for box in boxes:
+            bounds = np.array(
+                [_interval_bounds(r) for r in box], dtype=np.int64)
+            if bounds.shape != (dims, 2):
+                raise ValueError(f'A box needs {dims} (start, stop) bounds')
+            if np.all(bounds[:, 0] < bounds[:, 1]):
+                self.boxes = np.concatenate(
+                    (self._remove(self.boxes, bounds), bounds[np.newaxis]))
+
+    @classmethod
+    def covered(
+            cls, dims: int, boxes: Iterable[Box],
+            depth: int = 1) -> 'BoxSet':
+        """Create the set of points covered by at least depth of some boxes.
+
+        Rather than adding the boxes one at a time, this sweeps over all of
+        them at once. The distinct bounds along each axis divide space into a
+        grid of cells. Each box adds one to the count for every cell it
+        covers, using a difference array and cumulative sums, and the cells
+        with a high enough count become the set's boxes. This needs memory
+        for a count per cell, so it suits many boxes in few dimensions.
+
+        :dims:  The number of dimensions.
+        :boxes: The boxes, as for creating a box set. They may overlap.
+        :depth: The number of boxes that must cover a point.
+        """
+        bounds = np.array(
+            [[_interval_bounds(r) for r in box] for box in boxes],
+            dtype=np.int64).reshape((-1, dims, 2))
+        bounds = bounds[np.all(bounds[:, :, 0] < bounds[:, :, 1], axis=1)]
+        edges = [np.unique(bounds[:, axis]) for axis in range(dims)]
+        indices = [
+            np.searchsorted(edges[axis], bounds[:, axis])
+            for axis in range(dims)]
+
+        # Add one at each box's start corner, then alternately subtract and
+        # add at its other corners, so the cumulative sums are 1 inside.
+        counts = np.zeros([len(e) for e in edges], dtype=np.int64)
+        for corner in product((0, 1), repeat=dims):
+            cell = tuple(index[:, c] for index, c in zip(indices, corner))
+            np.add.at(counts, cell, -1 if sum(corner) % 2 else 1)
+        for axis in range(dims):
+            np.cumsum(counts, axis=axis, out=counts)
+
+        cells = np.argwhere(counts >= max(depth, 1))
+        box_set = cls(dims)
+        box_set.boxes = np.stack(
+            [np.stack((e[cells[:, axis]], e[cells[:, axis] + 1]), axis=1)
+             for axis, e in enumerate(edges)],
+            axis=1).reshape((-1, dims, 2))
+        return box_set
+
+    def _from_array(self, boxes: np.ndarray) -> 'BoxSet':
+        """Create a box set, like this one, from already disjoint boxes."""
+        box_set = BoxSet(self.dims)
+        box_set.boxes = boxes
+        return box_set
+
+    @staticmethod
+    def _clip(
+            boxes: np.ndarray, box: np.ndarray
+        ) -> Tuple[np.ndarray, np.ndarray]:
+        """Clip boxes to another box.
+
+        :return:
+            The clipped boxes and a mask selecting those that are not empty.
+        """
+        clipped = np.empty_like(boxes)
+        np.maximum(boxes[:, :, 0], box[:, 0], out=clipped[:, :, 0])
+        np.minimum(boxes[:, :, 1], box[:, 1], out=clipped[:, :, 1])
+        return clipped, np.all(clipped[:, :, 0] < clipped[:, :, 1], axis=1)
+
+    @classmethod
+    def _remove(cls, boxes: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """Remove a box from disjoint boxes, splitting them as necessary."""
+        clipped, overlaps = cls._clip(boxes, box)
+        if not overlaps.any():
+            return boxes
+        pieces = [boxes[~overlaps]]
+        rest, clipped = boxes[overlaps], clipped[overlaps]
+        for axis in range(box.shape[0]):
+            below = rest.copy()
+            below[:, axis, 1] = clipped[:, axis, 0]
+            above = rest.copy()
+            above[:, axis, 0] = clipped[:, axis, 1]
+            pieces.append(below[below[:, axis, 0] < below[:, axis, 1]])
+            pieces.append(above[above[:, axis, 0] < above[:, axis, 1]])
+            rest = rest.copy()
+            rest[:, axis] = clipped[:, axis]
+        return np.concatenate(pieces)
+
+    def __or__(self, other: 'BoxSet') -> 'BoxSet':
+        return self._from_array(
+            np.concatenate(((self - other).boxes, other.boxes)))
+
+    def __and__(self, other: 'BoxSet') -> 'BoxSet':
+        pieces = [self.boxes[:0]]
+        for box in other.boxes:
+            clipped, overlaps = self._clip(self.boxes, box)
+            pieces.append(clipped[overlaps])
+        return self._from_array(np.concatenate(pieces))
+
+    def __sub__(self, other: 'BoxSet') -> 'BoxSet':
+        if not other:
+            return self
+
+        # Only the boxes that meet other's bounding box can be affected.
+        bounds = np.stack(
+            (other.boxes[:, :, 0].min(axis=0),
+             other.boxes[:, :, 1].max(axis=0)), axis=1)
+        _, near = self._clip(self.boxes, bounds)
+        boxes = self.boxes[near]
+        for box in other.boxes:
+            boxes = self._remove(boxes, box)
+        return self._from_array(np.concatenate((self.boxes[~near], boxes)))
+
+    def __len__(self) -> int:
+        sizes = self.boxes[:, :, 1] - self.boxes[:, :, 0]
+        return int(sizes.prod(axis=1).sum())
+
+    def __bool__(self) -> bool:
+        return len(self.boxes) > 0
+
+    def __repr__(self):
+        return f'BoxSet({self.dims}, {self.boxes.tolist()})'